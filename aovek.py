@@ -1,14 +1,5 @@
 import argparse
 import json
-from PIL import Image
-
-from aovek.preprocess.download_dataset import download_dataset
-from aovek.preprocess.cvpr10_processing import CVPR10Processing
-from aovek.preprocess.voc_processing import VOCProcessing
-from aovek.training.train import Train
-from aovek.visualization.predict import Predict
-from aovek.validate.eval_metrics import EvalMetrics
-from aovek.video.video_to_image import VideoToImage
 
 
 parser = argparse.ArgumentParser(description='''
@@ -35,9 +26,22 @@ optional.add_argument('-evaluate', help='Evaluate trained model.',
                       action='store_true')
 optional.add_argument('-process_video', metavar='VIDEO',
                       help='Make photo without people from video')
+optional.add_argument('-export_model',
+                      help='Export inference model with folded batch '
+                      'normalization.',
+                      action='store_true')
+optional.add_argument('-quantize_model',
+                      help='Quantize inference model to eight bits and '
+                      'compare it with float model.',
+                      action='store_true')
+optional.add_argument('-export_weights',
+                      help='Export model weights to standalone archive.',
+                      action='store_true')
 
 
 def dataset_download(config):
+    from aovek.preprocess.download_dataset import download_dataset
+
     datasets = config['dataset']['dataset']
 
     for dataset in datasets:
@@ -48,6 +52,9 @@ def dataset_download(config):
 
 
 def processes_dataset(config):
+    from aovek.preprocess.cvpr10_processing import CVPR10Processing
+    from aovek.preprocess.voc_processing import VOCProcessing
+
     datasets = config['dataset']['dataset']
 
     for dataset in datasets:
@@ -56,28 +63,37 @@ def processes_dataset(config):
         elif dataset == 'voc':
             dataset_process = VOCProcessing(config)
 
-        dataset_process.pickle_dataset()
+        dataset_process.store_dataset()
 
         print('Taken time: {}'.format(str(dataset_process.get_time())))
 
 
 def train(config):
+    from aovek.training.train import Train
+
     train = Train(config)
     train.load_dataset()
     train.train(config)
 
 
 def predict(config):
+    from aovek.visualization.predict import Predict
+
     predict = Predict(config)
     predict.make_predictions_for_datasets()
 
 
 def evaluate(config):
+    from aovek.validate.eval_metrics import EvalMetrics
+
     eval_metrics = EvalMetrics(config)
     eval_metrics.eval_pickles_metrics()
 
 
 def process_video(config, video_path):
+    from PIL import Image
+    from aovek.video.video_to_image import VideoToImage
+
     video_processing = VideoToImage(config)
     image_array = video_processing.process_video_file(video_path)
 
@@ -87,6 +103,36 @@ def process_video(config, video_path):
     image.save(image_filename)
 
 
+def export_model(config):
+    from aovek.network.model_export import ModelExport
+
+    model_export = ModelExport(config)
+    model_export.export()
+
+    print('Verified: {}'.format(model_export.verify()))
+
+
+def quantize_model(config):
+    from aovek.network.model_quantization import ModelQuantization
+    from aovek.validate.quantization_metrics import QuantizationMetrics
+
+    model_quantization = ModelQuantization(config)
+    model_quantization.quantize()
+
+    quantization_metrics = QuantizationMetrics(config)
+    quantization_metrics.report()
+
+
+def export_weights(config):
+    from aovek.network.network import YOLO
+
+    network = YOLO(config)
+    network.use_quantized_model = False
+    network.use_weights_archive = False
+    network.load_model()
+    network.save_weights_archive()
+
+
 if __name__ == '__main__':
     args = parser.parse_args()
 
@@ -107,3 +153,9 @@ if __name__ == '__main__':
         evaluate(config)
     elif args.process_video:
         process_video(config, args.process_video)
+    elif args.export_model:
+        export_model(config)
+    elif args.quantize_model:
+        quantize_model(config)
+    elif args.export_weights:
+        export_weights(config)
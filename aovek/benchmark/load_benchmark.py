@@ -0,0 +1,90 @@
+import copy
+import json
+import multiprocessing
+from prettytable import PrettyTable
+
+
+class LoadBenchmark:
+    """
+        Class for measuring time to first prediction of every load path
+    """
+
+    load_paths = ['h5', 'weights_archive']
+
+    def __init__(self, config, repeats=3):
+        self.config = config
+
+        self.repeats = repeats
+
+    def run(self):
+        results = PrettyTable()
+
+        results.field_names = ['Load Path', 'Import Time', 'Load Time',
+                               'First Prediction Time', 'Total Time']
+
+        context = multiprocessing.get_context('spawn')
+
+        for load_path in self.load_paths:
+            config = self.create_config(load_path)
+
+            times = []
+
+            for _ in range(self.repeats):
+                with context.Pool(processes=1) as pool:
+                    times.append(pool.apply(measure_first_prediction,
+                                            (config,)))
+
+            times = min(times, key=lambda time: time[-1])
+
+            results.add_row([load_path] + list(times))
+
+        print(results)
+
+    def create_config(self, load_path):
+        config = copy.deepcopy(self.config)
+
+        predict = config['network']['predict']
+        predict['use_quantized_model'] = False
+        predict['use_inference_model'] = False
+        predict['use_weights_archive'] = load_path == 'weights_archive'
+
+        return config
+
+
+def measure_first_prediction(config):
+    from datetime import datetime
+
+    start_time = datetime.now()
+
+    import numpy as np
+    from aovek.network.network import YOLO
+
+    import_time = datetime.now()
+
+    network = YOLO(config)
+    network.load_model()
+
+    load_time = datetime.now()
+
+    image_size = config['image_info']['image_size']
+    color_channels = config['image_info']['color_channels']
+
+    image = np.zeros((1, image_size, image_size, color_channels),
+                     dtype=np.uint8)
+
+    network.predict_boxes(image)
+
+    prediction_time = datetime.now()
+
+    return ((import_time - start_time).total_seconds(),
+            (load_time - import_time).total_seconds(),
+            (prediction_time - load_time).total_seconds(),
+            (prediction_time - start_time).total_seconds())
+
+
+if __name__ == '__main__':
+    with open('./config.json') as config_file:
+        config = json.load(config_file)
+
+    load_benchmark = LoadBenchmark(config)
+    load_benchmark.run()
@@ -0,0 +1,131 @@
+import json
+import multiprocessing
+from prettytable import PrettyTable
+
+
+class LossBenchmark:
+    """
+        Class for comparing training step time of legacy and fused YOLO loss
+    """
+
+    def __init__(self, config, steps=50):
+        self.config = config
+
+        self.steps = steps
+
+    def run(self):
+        results = PrettyTable()
+
+        results.field_names = ['Loss', 'Step Time', 'Steps/sec',
+                               'Graph Ops', 'Peak RSS (MB)']
+
+        context = multiprocessing.get_context('spawn')
+
+        for loss_type in ('legacy', 'fused'):
+            with context.Pool(processes=1) as pool:
+                step_time, graph_ops, peak_rss =\
+                    pool.apply(measure_training_step,
+                               (self.config, loss_type, self.steps))
+
+            results.add_row([loss_type, step_time, 1 / step_time,
+                             graph_ops, peak_rss])
+
+        print(results)
+
+
+def measure_training_step(config, loss_type, steps):
+    import resource
+    from datetime import datetime
+    import numpy as np
+    from keras import backend as K
+    from aovek.network.network import YOLO
+
+    network = YOLO(config)
+    network.create_model()
+
+    if loss_type == 'legacy':
+        network.model.compile(optimizer=network.optimizer,
+                              loss=legacy_loss(network))
+
+    batch = np.random.uniform(size=(network.batch_size, network.image_size,
+                                    network.image_size,
+                                    network.color_channels))
+    labels = np.random.uniform(size=(network.batch_size, network.grid_size,
+                                     network.grid_size,
+                                     (network.number_of_annotations + 1)))
+    labels[:, :, :, 4] = np.round(labels[:, :, :, 4])
+
+    network.model.train_on_batch(batch, labels)
+
+    start_time = datetime.now()
+
+    for _ in range(steps):
+        network.model.train_on_batch(batch, labels)
+
+    end_time = datetime.now()
+
+    step_time = (end_time - start_time).total_seconds() / steps
+    graph_ops = len(K.get_session().graph.get_operations())
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+    return step_time, graph_ops, peak_rss
+
+
+def legacy_loss(network):
+    import tensorflow as tf
+
+    def custom_loss(true, pred):
+        loss = tf.Variable(0, dtype=tf.float32)
+
+        true =\
+            tf.reshape(true, shape=(-1, network.grid_size ** 2,
+                                    (network.number_of_annotations + 1)))
+        pred =\
+            tf.reshape(pred, shape=(-1, network.grid_size ** 2,
+                                    (network.number_of_annotations + 1)))
+
+        x_true = true[:, :, 0]
+        x_pred = pred[:, :, 0]
+
+        y_true = true[:, :, 1]
+        y_pred = pred[:, :, 1]
+
+        w_true = true[:, :, 2]
+        w_pred = pred[:, :, 2]
+
+        h_true = true[:, :, 3]
+        h_pred = pred[:, :, 3]
+
+        p_true = true[:, :, 4]
+        p_pred = pred[:, :, 4]
+
+        loss = tf.add(loss, tf.reduce_sum(
+            tf.scalar_mul(network.alpha_coord, tf.multiply(
+                p_true, tf.add(tf.squared_difference(x_true, x_pred),
+                               tf.squared_difference(y_true, y_pred))))))
+
+        loss = tf.add(loss, tf.reduce_sum(
+            tf.scalar_mul(network.alpha_coord, tf.multiply(
+                p_true, tf.add(tf.squared_difference(tf.sqrt(w_true),
+                                                     tf.sqrt(w_pred)),
+                               tf.squared_difference(tf.sqrt(h_true),
+                                                     tf.sqrt(h_pred)))))))
+
+        loss = tf.add(loss, tf.reduce_sum(tf.multiply(
+            p_true, tf.squared_difference(p_true, p_pred))))
+
+        loss = tf.add(loss, tf.reduce_sum(tf.scalar_mul(
+            network.alpha_noobj, tf.multiply(
+                (1 - p_true), tf.squared_difference(p_true, p_pred)))))
+
+        return loss
+
+    return custom_loss
+
+
+if __name__ == '__main__':
+    with open('./config.json') as config_file:
+        config = json.load(config_file)
+
+    loss_benchmark = LossBenchmark(config)
+    loss_benchmark.run()
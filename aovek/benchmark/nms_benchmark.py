@@ -0,0 +1,131 @@
+import json
+from datetime import datetime
+import numpy as np
+import tensorflow as tf
+from prettytable import PrettyTable
+
+from aovek.network.non_max_suppression import NonMaxSuppression
+
+
+class NMSBenchmark:
+    """
+        Class for comparing NumPy and TensorFlow graph non-max suppression
+    """
+
+    def __init__(self, config, number_of_frames=1000):
+        self.grid_size = config['label_info']['grid_size']
+        self.number_of_annotations =\
+            config['label_info']['number_of_annotations']
+
+        self.iou_threshold = config['network']['predict']['iou_threshold']
+        self.prob_threshold = config['network']['predict']['prob_threshold']
+
+        self.number_of_frames = number_of_frames
+
+        self.nms = NonMaxSuppression(config)
+
+    def run(self):
+        predictions = self.generate_predictions()
+
+        graph_time, graph_boxes = self.time_graph_nms(predictions)
+        numpy_time, numpy_boxes = self.time_numpy_nms(predictions)
+        batch_time, batch_boxes = self.time_batch_nms(predictions)
+
+        mismatches = self.count_mismatches(graph_boxes, numpy_boxes)
+        batch_mismatches = self.count_mismatches(graph_boxes, batch_boxes)
+
+        self.print_results([graph_time, numpy_time, batch_time],
+                           [0, mismatches, batch_mismatches])
+
+    def generate_predictions(self):
+        corners = np.random.uniform(size=(self.number_of_frames,
+                                          self.grid_size ** 2, 2, 2))
+        corners = np.sort(corners, axis=2).reshape(
+            (self.number_of_frames, self.grid_size ** 2, 4))
+        corners = corners[:, :, [0, 2, 1, 3]]
+
+        probabilities = np.random.uniform(size=(self.number_of_frames,
+                                                self.grid_size ** 2, 1))
+
+        return np.concatenate((corners, probabilities),
+                              axis=2).astype(np.float32)
+
+    def time_graph_nms(self, predictions):
+        graph = tf.Graph()
+
+        with graph.as_default(), tf.Session(graph=graph) as sess:
+            start_time = datetime.now()
+
+            true_boxes = [self.graph_nms(pred) for pred in predictions]
+            true_boxes = sess.run(true_boxes)
+
+            end_time = datetime.now()
+
+        return end_time - start_time, true_boxes
+
+    def graph_nms(self, predict):
+        predict = predict[predict[:, 4] > self.prob_threshold]
+
+        probabilities = predict[:, 4]
+        boxes = predict[:, :4]
+
+        true_boxes_idx =\
+            tf.image.non_max_suppression(boxes, probabilities,
+                                         self.grid_size ** 2,
+                                         iou_threshold=self.iou_threshold)
+        true_boxes = tf.gather(boxes, true_boxes_idx)
+        true_probabilities = tf.gather(probabilities, true_boxes_idx)
+
+        return tf.concat([true_boxes, true_probabilities[:, None]], axis=1)
+
+    def time_numpy_nms(self, predictions):
+        start_time = datetime.now()
+
+        true_boxes = [self.nms.suppress(pred) for pred in predictions]
+
+        end_time = datetime.now()
+
+        return end_time - start_time, true_boxes
+
+    def time_batch_nms(self, predictions):
+        start_time = datetime.now()
+
+        true_boxes, counts = self.nms.suppress_batch(predictions)
+
+        end_time = datetime.now()
+
+        true_boxes = [boxes[:count]
+                      for boxes, count in zip(true_boxes, counts)]
+
+        return end_time - start_time, true_boxes
+
+    def count_mismatches(self, graph_boxes, numpy_boxes):
+        mismatches = 0
+
+        for graph_box, numpy_box in zip(graph_boxes, numpy_boxes):
+            if graph_box.shape != numpy_box.shape or\
+                    not np.allclose(graph_box, numpy_box):
+                mismatches += 1
+
+        return mismatches
+
+    def print_results(self, times, mismatches):
+        results = PrettyTable()
+
+        results.add_column('NMS', ['TensorFlow graph', 'NumPy',
+                                   'NumPy batch'])
+        results.add_column('Time', times)
+        results.add_column('Frames/sec',
+                           [self.number_of_frames / time.total_seconds()
+                            for time in times])
+        results.add_column('Frames with different boxes', mismatches)
+
+        print(results)
+
+
+if __name__ == '__main__':
+    with open('./config.json') as config_file:
+        config = json.load(config_file)
+
+    nms_benchmark = NMSBenchmark(config)
+    nms_benchmark.run()
@@ -0,0 +1,91 @@
+import os
+import copy
+import json
+import itertools
+import multiprocessing
+from prettytable import PrettyTable
+
+
+class RuntimeBenchmark:
+    """
+        Class for sweeping session threading settings over predict_images
+    """
+
+    def __init__(self, config, number_of_frames=256, repeats=3):
+        self.config = config
+
+        self.number_of_frames = number_of_frames
+        self.repeats = repeats
+
+        cpu_count = os.cpu_count()
+
+        self.intra_op_threads =\
+            sorted(set([1, 2, 4, 8, 16, 32, cpu_count]) &
+                   set(range(1, cpu_count + 1)))
+        self.inter_op_threads = [1, 2]
+
+    def run(self):
+        results = PrettyTable()
+
+        results.field_names = ['Intra-op Threads', 'Inter-op Threads',
+                               'Frames/sec']
+
+        context = multiprocessing.get_context('spawn')
+
+        for intra_op_threads, inter_op_threads in\
+                itertools.product(self.intra_op_threads,
+                                  self.inter_op_threads):
+            config = self.create_config(intra_op_threads, inter_op_threads)
+
+            with context.Pool(processes=1) as pool:
+                frames_per_second =\
+                    pool.apply(measure_frames_per_second,
+                               (config, self.number_of_frames, self.repeats))
+
+            results.add_row([intra_op_threads, inter_op_threads,
+                             frames_per_second])
+
+        print(results)
+
+    def create_config(self, intra_op_threads, inter_op_threads):
+        config = copy.deepcopy(self.config)
+
+        runtime = config['network']['runtime']
+        runtime['intra_op_parallelism_threads'] = intra_op_threads
+        runtime['inter_op_parallelism_threads'] = inter_op_threads
+
+        return config
+
+
+def measure_frames_per_second(config, number_of_frames, repeats):
+    from datetime import datetime
+    import numpy as np
+    from aovek.network.network import YOLO
+
+    network = YOLO(config)
+    network.load_model()
+
+    image_size = config['image_info']['image_size']
+    color_channels = config['image_info']['color_channels']
+
+    video = np.random.uniform(size=(number_of_frames, image_size, image_size,
+                                    color_channels)).astype(np.float32)
+
+    network.predict_images(video[:network.inference_batch_size])
+
+    start_time = datetime.now()
+
+    for _ in range(repeats):
+        network.predict_images(video)
+
+    end_time = datetime.now()
+
+    return number_of_frames * repeats / (end_time - start_time).total_seconds()
+
+
+if __name__ == '__main__':
+    with open('./config.json') as config_file:
+        config = json.load(config_file)
+
+    runtime_benchmark = RuntimeBenchmark(config)
+    runtime_benchmark.run()
@@ -0,0 +1,81 @@
+import sys
+import subprocess
+from datetime import datetime
+from prettytable import PrettyTable
+
+
+class StartupBenchmark:
+    """
+        Class for measuring aovek.py startup time of every subcommand
+    """
+
+    subcommands = {
+        'python': 'pass',
+        '-dataset_download':
+            'from aovek.preprocess.download_dataset import download_dataset',
+        '-processes_dataset':
+            'from aovek.preprocess.cvpr10_processing import '
+            'CVPR10Processing\n'
+            'from aovek.preprocess.voc_processing import VOCProcessing',
+        '-train':
+            'from aovek.training.train import Train\n'
+            'from aovek.network.network import get_session\n'
+            'get_session()',
+        '-predict':
+            'from aovek.visualization.predict import Predict\n'
+            'from aovek.network.network import get_session\n'
+            'get_session()',
+        '-evaluate':
+            'from aovek.validate.eval_metrics import EvalMetrics\n'
+            'from aovek.network.network import get_session\n'
+            'get_session()',
+        '-process_video':
+            'from PIL import Image\n'
+            'from aovek.video.video_to_image import VideoToImage\n'
+            'from aovek.network.network import get_session\n'
+            'get_session()',
+        '-export_model':
+            'from aovek.network.model_export import ModelExport\n'
+            'from aovek.network.network import get_session\n'
+            'get_session()',
+        '-quantize_model':
+            'from aovek.network.model_quantization import '
+            'ModelQuantization\n'
+            'from aovek.validate.quantization_metrics import '
+            'QuantizationMetrics\n'
+            'from aovek.network.network import get_session\n'
+            'get_session()',
+        '-export_weights':
+            'from aovek.network.network import YOLO, get_session\n'
+            'get_session()'
+    }
+
+    def __init__(self, repeats=5):
+        self.repeats = repeats
+
+    def run(self):
+        results = PrettyTable()
+
+        results.field_names = ['Subcommand', 'Min Time', 'Mean Time']
+
+        for subcommand, code in self.subcommands.items():
+            times = [self.time_startup(code) for _ in range(self.repeats)]
+
+            results.add_row([subcommand, min(times),
+                             sum(times) / len(times)])
+
+        print(results)
+
+    def time_startup(self, code):
+        start_time = datetime.now()
+
+        subprocess.check_call([sys.executable, '-c', code])
+
+        end_time = datetime.now()
+
+        return (end_time - start_time).total_seconds()
+
+
+if __name__ == '__main__':
+    startup_benchmark = StartupBenchmark()
+    startup_benchmark.run()
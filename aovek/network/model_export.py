@@ -0,0 +1,104 @@
+import json
+import numpy as np
+
+from aovek.network.network import YOLO
+from aovek.utils.data_loading import DataLoading
+
+
+class ModelExport(DataLoading):
+    """
+        Class for exporting inference model with folded batch normalization
+    """
+
+    def __init__(self, config):
+        super().__init__(config)
+
+        self.network = YOLO(config)
+        self.network.use_inference_model = False
+        self.network.use_quantized_model = False
+        self.network.load_model()
+
+        self.inference_model = None
+
+        self.verification_images = config['network']['export'][
+            'verification_images']
+        self.tolerance = config['network']['export']['tolerance']
+
+    def export(self):
+        self.inference_model = self.create_folded_model()
+
+        self.inference_model.save(
+            self.network.inference_model_binary_data_file)
+
+    def create_folded_model(self):
+        inference_model = self.network.create_inference_model()
+
+        self.fold_weights(self.network.model, inference_model)
+
+        return inference_model
+
+    def fold_weights(self, model, inference_model):
+        for layer in inference_model.layers:
+            weights = self.get_layer_weights(model, layer.name)
+
+            if weights:
+                layer.set_weights(weights)
+
+    def get_layer_weights(self, model, layer_name):
+        weights = model.get_layer(layer_name).get_weights()
+
+        if not layer_name.startswith('conv_'):
+            return weights
+
+        norm_name = layer_name.replace('conv_', 'norm_')
+
+        try:
+            norm = model.get_layer(norm_name)
+        except ValueError as e:
+            return weights
+
+        return self.fold_batch_normalization(weights, norm)
+
+    def fold_batch_normalization(self, conv_weights, norm):
+        kernel, bias = conv_weights[-2:]
+        gamma, beta, moving_mean, moving_variance = norm.get_weights()
+
+        scale = gamma / np.sqrt(moving_variance + norm.epsilon)
+
+        folded_kernel = kernel * scale
+        folded_bias = (bias - moving_mean) * scale + beta
+
+        return conv_weights[:-2] + [folded_kernel, folded_bias]
+
+    def verify(self):
+        images = self.get_verification_images()
+
+        predict = self.network.model_predict(images)
+
+        self.network.model = self.inference_model
+        inference_predict = self.network.model_predict(images)
+
+        max_difference = np.max(np.abs(predict - inference_predict))
+
+        print('Max difference between original and inference model: {}'
+              .format(max_difference))
+
+        return max_difference <= self.tolerance
+
+    def get_verification_images(self):
+        validation_data = self.validation_data
+
+        number_of_images = min(self.verification_images,
+                               validation_data.shape[0])
+
+        return np.asarray(validation_data[:number_of_images])
+
+
+if __name__ == '__main__':
+    with open('./config.json') as config_file:
+        config = json.load(config_file)
+
+    model_export = ModelExport(config)
+    model_export.export()
+
+    print('Verified: {}'.format(model_export.verify()))
@@ -0,0 +1,123 @@
+import os
+import sys
+import json
+import tensorflow as tf
+from keras import backend as K
+from tensorflow.tools.graph_transforms import TransformGraph
+
+from aovek.network.model_export import ModelExport
+
+
+class ModelQuantization(ModelExport):
+    """
+        Class for post-training eight-bit quantization of inference model
+    """
+
+    quantization_transforms = ['add_default_attributes',
+                               'strip_unused_nodes',
+                               'remove_nodes(op=Identity)',
+                               'fold_constants(ignore_errors=true)',
+                               'quantize_weights',
+                               'quantize_nodes',
+                               'strip_unused_nodes',
+                               'sort_by_execution_order']
+
+    def __init__(self, config):
+        super().__init__(config)
+
+        self.quantized_model_file =\
+            config['network']['quantization']['quantized_model_file']
+        self.calibration_images =\
+            config['network']['quantization']['calibration_images']
+
+        self.min_max_log_file = self.quantized_model_file + '.min_max.log'
+
+    def quantize(self):
+        self.inference_model = self.create_folded_model()
+
+        input_name = self.inference_model.input.op.name
+        output_name = self.inference_model.output.op.name
+
+        graph_def = self.freeze_graph(output_name)
+
+        quantized_graph_def =\
+            TransformGraph(graph_def, [input_name], [output_name],
+                           self.quantization_transforms)
+
+        logged_graph_def =\
+            TransformGraph(quantized_graph_def, [input_name], [output_name],
+                           ['insert_logging(op=RequantizationRange, '
+                            'show_name=true, message="__requant_min_max:")'])
+
+        self.calibrate(logged_graph_def, input_name, output_name)
+
+        calibrated_graph_def =\
+            TransformGraph(quantized_graph_def, [input_name], [output_name],
+                           ['freeze_requantization_ranges('
+                            'min_max_log_file="{}")'
+                            .format(self.min_max_log_file),
+                            'strip_unused_nodes'])
+
+        self.save_quantized_model(calibrated_graph_def, input_name,
+                                  output_name)
+
+    def freeze_graph(self, output_name):
+        sess = K.get_session()
+
+        graph_def = tf.graph_util.convert_variables_to_constants(
+            sess, sess.graph.as_graph_def(), [output_name])
+
+        return graph_def
+
+    def calibrate(self, graph_def, input_name, output_name):
+        images = self.get_calibration_images()
+
+        graph = tf.Graph()
+        with graph.as_default():
+            tf.import_graph_def(graph_def, name='')
+
+        with tf.Session(graph=graph) as sess,\
+                open(self.min_max_log_file, 'w') as log_file:
+            sys.stderr.flush()
+            stderr = os.dup(2)
+            os.dup2(log_file.fileno(), 2)
+
+            try:
+                for start in range(0, images.shape[0],
+                                   self.network.inference_batch_size):
+                    end = start + self.network.inference_batch_size
+
+                    sess.run(output_name + ':0',
+                             feed_dict={input_name + ':0':
+                                        self.network.image_processing
+                                        .normalize_batch(images[start:end])})
+            finally:
+                os.dup2(stderr, 2)
+                os.close(stderr)
+
+    def get_calibration_images(self):
+        validation_data = self.validation_data
+
+        number_of_images = min(self.calibration_images,
+                               validation_data.shape[0])
+
+        return validation_data[:number_of_images]
+
+    def save_quantized_model(self, graph_def, input_name, output_name):
+        with open(self.quantized_model_file, 'wb') as f:
+            f.write(graph_def.SerializeToString())
+
+        metadata = {'input': input_name,
+                    'output': output_name,
+                    'output_shape': self.inference_model.output_shape}
+
+        with open(self.quantized_model_file + '.json', 'w') as f:
+            json.dump(metadata, f)
+
+
+if __name__ == '__main__':
+    with open('./config.json') as config_file:
+        config = json.load(config_file)
+
+    model_quantization = ModelQuantization(config)
+    model_quantization.quantize()
@@ -1,21 +1,26 @@
 import tensorflow as tf
 from keras import backend as K
 from keras.models import Model
-from keras.layers import Input, Conv2D, MaxPooling2D, Reshape,\
-    BatchNormalization, LeakyReLU, Dropout
+from keras.layers import Input, Conv2D, SeparableConv2D, MaxPooling2D,\
+    Reshape, BatchNormalization, LeakyReLU, Dropout
 from keras.models import load_model
 from keras.models import model_from_json
 from keras.callbacks import History, ModelCheckpoint
 from keras.optimizers import SGD, RMSprop, Adagrad, Adadelta, Adam, Adamax,\
     Nadam
 from keras.initializers import RandomNormal
+from datetime import datetime
 import json
+import hashlib
 import numpy as np
 
 from aovek.validate.model_metrics import ModelMetrics
-
-sess = tf.Session()
-K.set_session(sess)
+from aovek.utils.image_processing import ImageProcessing
+from aovek.utils.dataset_sequence import DatasetSequence
+from aovek.network.non_max_suppression import NonMaxSuppression
+from aovek.network.session import get_session, create_session_config
+from aovek.network.quantized_model import QuantizedModel
+from aovek.network.prediction_cache import PredictionCache
 
 
 class YOLO:
@@ -43,6 +48,21 @@ class YOLO:
             config['network']['train']['optimizer']['learning_rate']
         self.decay = config['network']['train']['optimizer']['decay']
 
+        self.distillation_alpha =\
+            config['network']['train']['distillation']['alpha']
+
+        self.streaming = config['network']['train']['streaming']['enabled']
+        self.workers = config['network']['train']['streaming']['workers']
+        self.max_queue_size =\
+            config['network']['train']['streaming']['max_queue_size']
+        self.use_multiprocessing =\
+            config['network']['train']['streaming']['use_multiprocessing']
+
+        self.width_multiplier =\
+            config['network']['architecture']['width_multiplier']
+        self.separable = config['network']['architecture']['separable']
+        self.reduced_head = config['network']['architecture']['reduced_head']
+
         self.optimizer = None
 
         self.metrics = None
@@ -50,6 +70,7 @@ class YOLO:
 
         self.model_metrics = None
         self.model_structure = None
+        self.model_complexity = None
 
         self.model_binary_data_file =\
             config['network']['model_binary_data_file']
@@ -57,13 +78,36 @@ class YOLO:
             config['network']['json_model_structure']
         self.model_checkpoint_binary_data_file =\
             config['network']['model_checkpoint_binary_data_file']
+        self.inference_model_binary_data_file =\
+            config['network']['inference_model_binary_data_file']
+        self.use_inference_model =\
+            config['network']['predict']['use_inference_model']
+        self.quantized_model_file =\
+            config['network']['quantization']['quantized_model_file']
+        self.use_quantized_model =\
+            config['network']['predict']['use_quantized_model']
+        self.weights_archive_file = config['network']['weights_archive_file']
+        self.use_weights_archive =\
+            config['network']['predict']['use_weights_archive']
 
         self.iou_threshold = config['network']['predict']['iou_threshold']
         self.prob_threshold = config['network']['predict']['prob_threshold']
+        self.inference_batch_size =\
+            config['network']['predict']['inference_batch_size']
+
+        self.runtime = config['network']['runtime']
+
+        self.image_processing = ImageProcessing(config)
+        self.nms = NonMaxSuppression(config)
+        self.prediction_cache = PredictionCache(config)
 
         self.model = None
+        self.inference_function = None
+        self.loss_function = None
 
     def create_model(self):
+        get_session(self.runtime)
+
         input = Input(shape=(self.image_size, self.image_size,
                              self.color_channels))
 
@@ -79,161 +123,49 @@ class YOLO:
         model.summary()
 
         self.model = model
+        self.inference_function = None
 
-    def create_network(self, input):
-        network = Conv2D(filters=32,
-                         kernel_size=(3, 3),
-                         strides=(1, 1),
-                         padding='same',
-                         name='conv_1',
-                         kernel_initializer=RandomNormal(),
-                         use_bias=True)(input)
-        network = BatchNormalization(name='norm_1')(network)
-        network = LeakyReLU(alpha=0.1, name='relu_1')(network)
+    def create_network(self, input, inference=False):
+        network = self.conv_block(input, 32, (3, 3), 1, inference)
         network = MaxPooling2D(pool_size=(2, 2),
                                name='pool_1')(network)
 
-        network = Conv2D(filters=64,
-                         kernel_size=(3, 3),
-                         strides=(1, 1),
-                         padding='same',
-                         name='conv_2',
-                         kernel_initializer=RandomNormal(),
-                         use_bias=True)(network)
-        network = BatchNormalization(name='norm_2')(network)
-        network = LeakyReLU(alpha=0.1, name='relu_2')(network)
+        network = self.conv_block(network, 64, (3, 3), 2, inference)
         network = MaxPooling2D(pool_size=(2, 2),
                                name='pool_2')(network)
 
-        network = Conv2D(filters=128,
-                         kernel_size=(3, 3),
-                         strides=(1, 1),
-                         padding='same',
-                         name='conv_3',
-                         kernel_initializer=RandomNormal(),
-                         use_bias=True)(network)
-        network = BatchNormalization(name='norm_3')(network)
-        network = LeakyReLU(alpha=0.1, name='relu_3')(network)
-        network = Conv2D(filters=64,
-                         kernel_size=(1, 1),
-                         strides=(1, 1),
-                         padding='same',
-                         name='conv_4',
-                         kernel_initializer=RandomNormal(),
-                         use_bias=True)(network)
-        network = BatchNormalization(name='norm_4')(network)
-        network = LeakyReLU(alpha=0.1, name='relu_4')(network)
-        network = Conv2D(filters=128,
-                         kernel_size=(3, 3),
-                         strides=(1, 1),
-                         padding='same',
-                         name='conv_5',
-                         kernel_initializer=RandomNormal(),
-                         use_bias=True)(network)
-        network = BatchNormalization(name='norm_5')(network)
-        network = LeakyReLU(alpha=0.1, name='relu_5')(network)
+        network = self.conv_block(network, 128, (3, 3), 3, inference)
+        network = self.conv_block(network, 64, (1, 1), 4, inference)
+        network = self.conv_block(network, 128, (3, 3), 5, inference)
         network = MaxPooling2D(pool_size=(2, 2),
                                name='pool_3')(network)
 
-        network = Conv2D(filters=256,
-                         kernel_size=(3, 3),
-                         strides=(1, 1),
-                         padding='same',
-                         name='conv_6',
-                         kernel_initializer=RandomNormal(),
-                         use_bias=True)(network)
-        network = BatchNormalization(name='norm_6')(network)
-        network = LeakyReLU(alpha=0.1, name='relu_6')(network)
-        network = Conv2D(filters=128,
-                         kernel_size=(1, 1),
-                         strides=(1, 1),
-                         padding='same',
-                         name='conv_7',
-                         kernel_initializer=RandomNormal(),
-                         use_bias=True)(network)
-        network = BatchNormalization(name='norm_7')(network)
-        network = LeakyReLU(alpha=0.1, name='relu_7')(network)
-        network = Conv2D(filters=256,
-                         kernel_size=(3, 3),
-                         strides=(1, 1),
-                         padding='same',
-                         name='conv_8',
-                         kernel_initializer=RandomNormal(),
-                         use_bias=True)(network)
-        network = BatchNormalization(name='norm_8')(network)
-        network = LeakyReLU(alpha=0.1, name='relu_8')(network)
+        network = self.conv_block(network, 256, (3, 3), 6, inference)
+        network = self.conv_block(network, 128, (1, 1), 7, inference)
+        network = self.conv_block(network, 256, (3, 3), 8, inference)
         network = MaxPooling2D(pool_size=(2, 2),
                                name='pool_4')(network)
 
-        network = Conv2D(filters=512,
-                         kernel_size=(3, 3),
-                         strides=(1, 1),
-                         padding='same',
-                         name='conv_9',
-                         kernel_initializer=RandomNormal(),
-                         use_bias=True)(network)
-        network = BatchNormalization(name='norm_9')(network)
-        network = LeakyReLU(alpha=0.1, name='relu_9')(network)
-        network = Conv2D(filters=256,
-                         kernel_size=(1, 1),
-                         strides=(1, 1),
-                         padding='same',
-                         name='conv_10',
-                         kernel_initializer=RandomNormal(),
-                         use_bias=True)(network)
-        network = BatchNormalization(name='norm_10')(network)
-        network = LeakyReLU(alpha=0.1, name='relu_10')(network)
-        network = Conv2D(filters=512,
-                         kernel_size=(3, 3),
-                         strides=(1, 1),
-                         padding='same',
-                         name='conv_11',
-                         kernel_initializer=RandomNormal(),
-                         use_bias=True)(network)
-        network = BatchNormalization(name='norm_11')(network)
-        network = LeakyReLU(alpha=0.1, name='relu_11')(network)
-        network = Conv2D(filters=256,
-                         kernel_size=(1, 1),
-                         strides=(1, 1),
-                         padding='same',
-                         name='conv_12',
-                         kernel_initializer=RandomNormal(),
-                         use_bias=True)(network)
-        network = BatchNormalization(name='norm_12')(network)
-        network = LeakyReLU(alpha=0.1, name='relu_12')(network)
-        network = Conv2D(filters=512,
-                         kernel_size=(3, 3),
-                         strides=(1, 1),
-                         padding='same',
-                         name='conv_13',
-                         kernel_initializer=RandomNormal(),
-                         use_bias=True)(network)
-        network = BatchNormalization(name='norm_13')(network)
-        network = LeakyReLU(alpha=0.1, name='relu_13')(network)
+        network = self.conv_block(network, 512, (3, 3), 9, inference)
+        network = self.conv_block(network, 256, (1, 1), 10, inference)
+        network = self.conv_block(network, 512, (3, 3), 11, inference)
+        network = self.conv_block(network, 256, (1, 1), 12, inference)
+        network = self.conv_block(network, 512, (3, 3), 13, inference)
         network = MaxPooling2D(pool_size=(2, 2),
                                name='pool_5')(network)
 
-        network = Conv2D(filters=1024,
-                         kernel_size=(3, 3),
-                         strides=(1, 1),
-                         padding='same',
-                         name='conv_14',
-                         kernel_initializer=RandomNormal(),
-                         use_bias=True)(network)
-        network = BatchNormalization(name='norm_14')(network)
-        network = LeakyReLU(alpha=0.1, name='relu_14')(network)
-        network = Dropout(rate=0.5, name='drop_1')(network)
+        if self.reduced_head:
+            network = self.conv_block(network, 512, (3, 3), 14, inference)
+            if not inference:
+                network = Dropout(rate=0.5, name='drop_1')(network)
+        else:
+            network = self.conv_block(network, 1024, (3, 3), 14, inference)
+            if not inference:
+                network = Dropout(rate=0.5, name='drop_1')(network)
 
-        network = Conv2D(filters=1024,
-                         kernel_size=(3, 3),
-                         strides=(1, 1),
-                         padding='same',
-                         name='conv_15',
-                         kernel_initializer=RandomNormal(),
-                         use_bias=True)(network)
-        network = BatchNormalization(name='norm_15')(network)
-        network = LeakyReLU(alpha=0.1, name='relu_15')(network)
-        network = Dropout(rate=0.5, name='drop_2')(network)
+            network = self.conv_block(network, 1024, (3, 3), 15, inference)
+            if not inference:
+                network = Dropout(rate=0.5, name='drop_2')(network)
 
         network = Conv2D(filters=(self.number_of_annotations + 1),
                          kernel_size=(1, 1),
@@ -250,6 +182,48 @@ class YOLO:
 
         return network
 
+    def conv_block(self, network, filters, kernel_size, number,
+                   inference=False):
+        filters = self.scale_filters(filters)
+
+        if self.separable and kernel_size != (1, 1) and number != 1:
+            network = SeparableConv2D(filters=filters,
+                                      kernel_size=kernel_size,
+                                      strides=(1, 1),
+                                      padding='same',
+                                      name='conv_{}'.format(number),
+                                      depthwise_initializer=RandomNormal(),
+                                      pointwise_initializer=RandomNormal(),
+                                      use_bias=True)(network)
+        else:
+            network = Conv2D(filters=filters,
+                             kernel_size=kernel_size,
+                             strides=(1, 1),
+                             padding='same',
+                             name='conv_{}'.format(number),
+                             kernel_initializer=RandomNormal(),
+                             use_bias=True)(network)
+        if not inference:
+            network = BatchNormalization(
+                name='norm_{}'.format(number))(network)
+        network = LeakyReLU(alpha=0.1,
+                            name='relu_{}'.format(number))(network)
+
+        return network
+
+    def scale_filters(self, filters):
+        return max(8, int(round(filters * self.width_multiplier)))
+
+    def create_inference_model(self):
+        get_session(self.runtime)
+
+        input = Input(shape=(self.image_size, self.image_size,
+                             self.color_channels))
+
+        network = self.create_network(input, inference=True)
+
+        return Model(input, network)
+
     def create_optimizer(self):
         if self.optimizer_type == 'SGD':
             optimizer = SGD(lr=self.learning_rate, decay=self.decay)
@@ -269,24 +243,76 @@ class YOLO:
         return optimizer
 
     def train(self, train_data, train_labels, validation_data,
-              validation_labels):
+              validation_labels, teacher=None):
         self.metrics = ModelMetrics(validation_data, validation_labels,
                                     self)
 
+        if teacher is None:
+            self.fit(train_data, train_labels, validation_data,
+                     validation_labels)
+            return
+
+        train_labels =\
+            self.add_teacher_targets(teacher, train_data, train_labels)
+        validation_labels =\
+            self.add_teacher_targets(teacher, validation_data,
+                                     validation_labels)
+
+        self.model.compile(optimizer=self.optimizer,
+                           loss=self.distillation_loss)
+
+        self.fit(train_data, train_labels, validation_data,
+                 validation_labels)
+
+        self.model.compile(optimizer=self.optimizer,
+                           loss=self.custom_loss)
+
+    def add_teacher_targets(self, teacher, data, labels):
+        teacher_targets = teacher.model_predict(data)
+
+        return np.concatenate((np.asarray(labels), teacher_targets), axis=3)
+
+    def fit(self, train_data, train_labels, validation_data,
+            validation_labels):
         model_checkpoint = ModelCheckpoint(
             self.model_checkpoint_binary_data_file, monitor='val_loss')
 
-        self.model.fit(train_data, train_labels,
-                       batch_size=self.batch_size,
-                       epochs=self.number_of_epochs,
-                       validation_data=(validation_data, validation_labels),
-                       shuffle=True,
-                       callbacks=[self.history, self.metrics,
-                                  model_checkpoint])
+        if not self.is_streaming(train_data):
+            self.model.fit(train_data, train_labels,
+                           batch_size=self.batch_size,
+                           epochs=self.number_of_epochs,
+                           validation_data=(validation_data,
+                                            validation_labels),
+                           shuffle=True,
+                           callbacks=[self.history, self.metrics,
+                                      model_checkpoint])
+            return
+
+        train_sequence =\
+            self.create_sequence(train_data, train_labels, shuffle=True)
+        validation_sequence =\
+            self.create_sequence(validation_data, validation_labels)
+
+        self.model.fit_generator(
+            train_sequence,
+            steps_per_epoch=len(train_sequence),
+            epochs=self.number_of_epochs,
+            validation_data=validation_sequence,
+            validation_steps=len(validation_sequence),
+            callbacks=[self.history, self.metrics, model_checkpoint],
+            workers=self.workers,
+            max_queue_size=self.max_queue_size,
+            use_multiprocessing=self.use_multiprocessing,
+            shuffle=True)
+
+    def is_streaming(self, data):
+        return self.streaming or data.dtype == np.uint8
+
+    def create_sequence(self, data, labels, shuffle=False):
+        return DatasetSequence(data, labels, self.batch_size,
+                               self.image_processing, shuffle=shuffle)
 
     def custom_loss(self, true, pred):
-        loss = tf.Variable(0, dtype=tf.float32)
-
         true =\
             tf.reshape(true, shape=(-1, self.grid_size ** 2,
                                     (self.number_of_annotations + 1)))
@@ -294,75 +320,238 @@ class YOLO:
             tf.reshape(pred, shape=(-1, self.grid_size ** 2,
                                     (self.number_of_annotations + 1)))
 
-        x_true = true[:, :, 0]
-        x_pred = pred[:, :, 0]
+        coord_mask, sqrt_mask, confidence_mask = self.get_loss_masks()
+
+        p_true = true[:, :, 4:5]
+
+        weights =\
+            tf.add(tf.multiply(self.alpha_coord * p_true, coord_mask),
+                   tf.multiply(p_true + self.alpha_noobj * (1 - p_true),
+                               confidence_mask))
 
-        y_true = true[:, :, 1]
-        y_pred = pred[:, :, 1]
+        true = self.safe_sqrt_channels(true, sqrt_mask)
+        pred = self.safe_sqrt_channels(pred, sqrt_mask)
 
-        w_true = true[:, :, 2]
-        w_pred = pred[:, :, 2]
+        loss = tf.reduce_sum(
+            tf.multiply(weights, tf.squared_difference(true, pred)))
 
-        h_true = true[:, :, 3]
-        h_pred = pred[:, :, 3]
+        return loss
+
+    def get_loss_masks(self):
+        coord_mask = np.zeros(self.number_of_annotations + 1,
+                              dtype=np.float32)
+        coord_mask[:4] = 1
+
+        sqrt_mask = np.zeros(self.number_of_annotations + 1,
+                             dtype=np.float32)
+        sqrt_mask[2:4] = 1
+
+        confidence_mask = np.zeros(self.number_of_annotations + 1,
+                                   dtype=np.float32)
+        confidence_mask[4] = 1
 
-        p_true = true[:, :, 4]
-        p_pred = pred[:, :, 4]
+        return (tf.constant(coord_mask), tf.constant(sqrt_mask),
+                tf.constant(confidence_mask))
 
-        loss = tf.add(loss, tf.reduce_sum(
-            tf.scalar_mul(self.alpha_coord, tf.multiply(
-                p_true, tf.add(tf.squared_difference(x_true, x_pred),
-                               tf.squared_difference(y_true, y_pred))))))
+    def safe_sqrt_channels(self, tensor, sqrt_mask):
+        sqrt_tensor = tf.sqrt(tf.maximum(tensor, K.epsilon()))
 
-        loss = tf.add(loss, tf.reduce_sum(
-            tf.scalar_mul(self.alpha_coord, tf.multiply(
-                p_true, tf.add(tf.squared_difference(tf.sqrt(w_true),
-                                                     tf.sqrt(w_pred)),
-                               tf.squared_difference(tf.sqrt(h_true),
-                                                     tf.sqrt(h_pred)))))))
+        return tensor + tf.multiply(sqrt_mask, sqrt_tensor - tensor)
 
-        loss = tf.add(loss, tf.reduce_sum(tf.multiply(
-            p_true, tf.squared_difference(p_true, p_pred))))
+    def distillation_loss(self, true, pred):
+        labels_true = true[:, :, :, :(self.number_of_annotations + 1)]
+        teacher_true = true[:, :, :, (self.number_of_annotations + 1):]
 
-        loss = tf.add(loss, tf.reduce_sum(tf.scalar_mul(
-            self.alpha_noobj, tf.multiply(
-                (1 - p_true), tf.squared_difference(p_true, p_pred)))))
+        loss = tf.add(
+            tf.scalar_mul(1 - self.distillation_alpha,
+                          self.custom_loss(labels_true, pred)),
+            tf.scalar_mul(self.distillation_alpha,
+                          self.custom_loss(teacher_true, pred)))
 
         return loss
 
     def predict(self, image):
-        predict = self.model.predict(image)
+        predict = self.model_predict(image)
 
         predict = self.boxes_to_corners(predict)
 
         return predict
 
-    def predict_boxes(self, image):
-        predict = self.predict(image)
+    def model_predict(self, images):
+        if images.dtype != np.uint8:
+            return self.model.predict(images)
 
-        true_boxes = self.non_max_suppression(predict)
+        predict = np.empty(shape=((images.shape[0],) +
+                                  self.model.output_shape[1:]),
+                           dtype=np.float32)
 
-        return true_boxes
+        for start in range(0, images.shape[0], self.batch_size):
+            end = start + self.batch_size
 
-    def predict_images(self, video):
-        video_predictions = self.predict(video)
+            predict[start:end] = self.model.predict(
+                self.image_processing.normalize_batch(images[start:end]))
+
+        return predict
+
+    def predict_raw(self, images, store_folders=None):
+        if store_folders is None or not self.prediction_cache.enabled:
+            return self.model_predict(images)
+
+        key = self.prediction_cache.get_key(self.get_weights_hash(),
+                                            store_folders)
+
+        predict = self.prediction_cache.load(key)
+
+        if predict is None or predict.shape[0] != images.shape[0]:
+            predict = self.model_predict(images)
+            self.prediction_cache.save(key, predict)
+
+        return predict
+
+    def predict_raw_stream(self, batches, size, store_folders=None):
+        key = None
+        cached = None
+        entry = None
+
+        if store_folders is not None and self.prediction_cache.enabled:
+            key = self.prediction_cache.get_key(self.get_weights_hash(),
+                                                store_folders)
+
+            cached = self.prediction_cache.load(key, mmap_mode='r')
+
+            if cached is not None and cached.shape[0] != size:
+                cached = None
+
+            if cached is None and size > 0:
+                entry = self.prediction_cache.create_entry(
+                    key, (size,) + tuple(self.model.output_shape[1:]))
+
+        try:
+            start = 0
+            for images, labels in batches:
+                end = start + images.shape[0]
 
-        predictions = []
+                if cached is not None:
+                    predict = np.array(cached[start:end])
+                else:
+                    predict = self.model_predict(images)
 
-        for pred in video_predictions:
-            true_boxes = self.non_max_suppression(pred)
+                    if entry is not None:
+                        entry[start:end] = predict
 
-            predictions.append(true_boxes)
+                start = end
 
-        predictions = sess.run(predictions)
+                yield predict, labels
 
-        max_pred = max(len(pred) for pred in predictions) + 1
-        predictions =\
-            np.array([np.vstack([pred, [[0] * 5] * (max_pred - len(pred))])
-                      for pred in predictions])
+            if entry is not None:
+                self.prediction_cache.finish_entry(key, entry)
+                entry = None
+        finally:
+            if entry is not None:
+                self.prediction_cache.discard_entry(entry)
+
+    def get_weights_hash(self):
+        weights_hash = hashlib.sha1()
+
+        if isinstance(self.model, QuantizedModel):
+            with open(self.quantized_model_file, 'rb') as f:
+                for block in iter(lambda: f.read(1 << 20), b''):
+                    weights_hash.update(block)
+        else:
+            for weight in self.model.get_weights():
+                weights_hash.update(str(weight.shape).encode('utf-8'))
+                weights_hash.update(np.ascontiguousarray(weight).tobytes())
+
+        return weights_hash.hexdigest()
+
+    def predict_boxes(self, image):
+        true_boxes, counts = self.run_inference(image)
+
+        return true_boxes[0, :counts[0]]
+
+    def predict_images(self, video):
+        predictions = np.empty(shape=(video.shape[0], self.nms.max_boxes,
+                                      (self.number_of_annotations + 1)),
+                               dtype=np.float32)
+        counts = np.empty(shape=(video.shape[0],), dtype=np.int32)
+
+        for start in range(0, video.shape[0], self.inference_batch_size):
+            end = start + self.inference_batch_size
+
+            predictions[start:end], counts[start:end] =\
+                self.run_inference(video[start:end])
+
+        predictions = self.trim_predictions(predictions, counts)
 
         return predictions
 
+    def predict_image_chunks(self, chunks):
+        for chunk in chunks:
+            yield self.predict_images(chunk)
+
+    def run_inference(self, images):
+        inference_function = self.get_inference_function()
+
+        images = self.image_processing.normalize_batch(images)
+
+        true_boxes, counts = inference_function([images, 0])
+
+        return true_boxes, counts
+
+    def get_inference_function(self):
+        if self.inference_function is None:
+            self.inference_function = self.create_inference_function()
+
+        return self.inference_function
+
+    def create_inference_function(self):
+        image = tf.placeholder(tf.float32,
+                               shape=(None, self.image_size, self.image_size,
+                                      self.color_channels),
+                               name='inference_image')
+
+        predict = self.model(image)
+        predict = tf.reshape(predict, shape=(-1, self.grid_size ** 2,
+                                             (self.number_of_annotations + 1)))
+
+        corners_predict =\
+            tf.concat([predict[:, :, 0:2] - (predict[:, :, 2:4] / 2),
+                       predict[:, :, 0:2] + (predict[:, :, 2:4] / 2),
+                       predict[:, :, 4:]], axis=2)
+
+        true_boxes, counts = tf.py_func(self.suppress_inference_batch,
+                                        [corners_predict],
+                                        [tf.float32, tf.int32],
+                                        stateful=False,
+                                        name='inference_nms')
+        true_boxes.set_shape((None, self.nms.max_boxes,
+                              (self.number_of_annotations + 1)))
+        counts.set_shape((None,))
+
+        return K.function([image, K.learning_phase()], [true_boxes, counts])
+
+    def run_quantized_inference(self, inputs):
+        predict = self.boxes_to_corners(self.model.predict(inputs[0]))
+
+        return self.suppress_inference_batch(predict)
+
+    def suppress_inference_batch(self, predictions):
+        true_boxes, counts = self.nms.suppress_batch(predictions)
+
+        return true_boxes.astype(np.float32), counts.astype(np.int32)
+
+    def trim_predictions(self, predictions, counts):
+        max_pred = int(np.max(np.append(counts, 0))) + 1
+
+        if max_pred > predictions.shape[1]:
+            predictions = np.pad(predictions,
+                                 ((0, 0),
+                                  (0, max_pred - predictions.shape[1]),
+                                  (0, 0)),
+                                 mode='constant')
+
+        return predictions[:, :max_pred]
+
     def boxes_to_corners(self, prediction):
         prediction = np.reshape(prediction, (-1, self.grid_size ** 2,
                                              self.number_of_annotations + 1))
@@ -380,40 +569,142 @@ class YOLO:
 
         return corners_prediction
 
-    def non_max_suppression(self, predict):
-        predict = predict[predict[:, 4] > self.prob_threshold]
-
-        probabilities = predict[:, 4]
-        boxes = predict[:, :4]
-
-        true_boxes_idx =\
-            tf.image.non_max_suppression(boxes, probabilities,
-                                         self.grid_size ** 2,
-                                         iou_threshold=self.iou_threshold)
-        true_boxes = tf.gather(boxes, true_boxes_idx)
-        true_probabilities = tf.gather(probabilities, true_boxes_idx)
-
-        true_boxes = tf.concat([true_boxes, true_probabilities[:, None]],
-                               axis=1)
-
-        return true_boxes
-
-    def sess_run(self, tensor):
-        return sess.run(tensor)
-
     def save_model(self):
         self.model.save(self.model_binary_data_file)
 
     def load_model(self):
-        custom_objects = self.get_custom_objects()
-        self.model = load_model(self.model_binary_data_file,
-                                custom_objects=custom_objects)
+        get_session(self.runtime)
+
+        if self.use_quantized_model:
+            self.model = QuantizedModel(self.quantized_model_file,
+                                        self.runtime,
+                                        self.inference_batch_size)
+            self.inference_function = self.run_quantized_inference
+            return
+
+        if self.use_weights_archive:
+            self.load_weights_archive()
+        elif self.use_inference_model:
+            self.model = load_model(self.inference_model_binary_data_file,
+                                    compile=False)
+        else:
+            custom_objects = self.get_custom_objects()
+            self.model = load_model(self.model_binary_data_file,
+                                    custom_objects=custom_objects)
+
+        self.inference_function = self.create_inference_function()
 
     def load_model_file(self, model_file):
+        get_session(self.runtime)
+
         custom_objects = self.get_custom_objects()
         self.model = load_model(model_file,
                                 custom_objects=custom_objects)
 
+        self.inference_function = self.create_inference_function()
+
+    def save_weights_archive(self):
+        metadata = self.get_archive_metadata()
+
+        self.check_archive_model(metadata)
+
+        weights = {}
+
+        for layer in self.model.layers:
+            layer_weights = layer.get_weights()
+            if not layer_weights:
+                continue
+
+            metadata['layers'][layer.name] = len(layer_weights)
+
+            for n, weight in enumerate(layer_weights):
+                weights['{}/{}'.format(layer.name, n)] = weight
+
+        np.savez(self.weights_archive_file,
+                 metadata=np.array(json.dumps(metadata)), **weights)
+
+    def get_archive_metadata(self):
+        layer_names = [layer.name for layer in self.model.layers]
+
+        _, image_size, _, color_channels = self.model.input_shape
+        _, grid_size, _, channels = self.model.output_shape
+
+        return {'image_size': image_size,
+                'color_channels': color_channels,
+                'grid_size': grid_size,
+                'number_of_annotations': channels - 1,
+                'width_multiplier': self.width_multiplier,
+                'separable': any(isinstance(layer, SeparableConv2D)
+                                 for layer in self.model.layers),
+                'reduced_head': 'conv_15' not in layer_names,
+                'inference': not any(isinstance(layer, BatchNormalization)
+                                     for layer in self.model.layers),
+                'layers': {}}
+
+    def check_archive_model(self, metadata):
+        self.set_archive_architecture(metadata)
+
+        with tf.Graph().as_default():
+            input = Input(shape=(self.image_size, self.image_size,
+                                 self.color_channels))
+
+            network = self.create_network(input,
+                                          inference=metadata['inference'])
+
+            expected_weights = self.get_weights_shapes(Model(input, network))
+
+        if expected_weights != self.get_weights_shapes(self.model):
+            raise ValueError('Model weights do not match architecture '
+                             '(width_multiplier {}, separable {}, '
+                             'reduced_head {})'
+                             .format(self.width_multiplier, self.separable,
+                                     self.reduced_head))
+
+    def get_weights_shapes(self, model):
+        return {layer.name: [K.int_shape(weight) for weight in layer.weights]
+                for layer in model.layers if layer.weights}
+
+    def load_weights_archive(self):
+        get_session(self.runtime)
+
+        with np.load(self.weights_archive_file) as archive:
+            metadata = json.loads(str(archive['metadata']))
+
+            self.set_archive_architecture(metadata)
+
+            input = Input(shape=(self.image_size, self.image_size,
+                                 self.color_channels))
+
+            network = self.create_network(input,
+                                          inference=metadata['inference'])
+
+            self.model = Model(input, network)
+
+            weight_values = []
+
+            for layer_name, weights_number in metadata['layers'].items():
+                layer = self.model.get_layer(layer_name)
+
+                layer_weights =\
+                    [archive['{}/{}'.format(layer_name, n)]
+                     for n in range(weights_number)]
+
+                weight_values.extend(zip(layer.weights, layer_weights))
+
+        K.batch_set_value(weight_values)
+
+    def set_archive_architecture(self, metadata):
+        for key in ('image_size', 'color_channels', 'grid_size',
+                    'number_of_annotations'):
+            if metadata[key] != getattr(self, key):
+                raise ValueError('Weights archive {} is {}, config is {}'
+                                 .format(key, metadata[key],
+                                         getattr(self, key)))
+
+        self.width_multiplier = metadata['width_multiplier']
+        self.separable = metadata['separable']
+        self.reduced_head = metadata['reduced_head']
+
     def save_json_model_structure(self):
         json_model_structure = self.model.to_json()
 
@@ -421,34 +712,43 @@ class YOLO:
             json.dump(json_model_structure, f)
 
     def load_model_from_json_structure(self):
+        get_session(self.runtime)
+
         custom_objects = self.get_custom_objects()
         self.model = model_from_json(self.model_json_structure_file,
                                      custom_objects=custom_objects)
 
     def get_custom_objects(self):
-        custom_objects = {"custom_loss": self.custom_loss}
+        custom_objects = {"custom_loss": self.custom_loss,
+                          "distillation_loss": self.distillation_loss}
 
         return custom_objects
 
     def summary(self, train_data, train_labels, validation_data,
-                validation_labels, test_data, test_labels):
+                validation_labels, test_data, test_labels,
+                store_folders=None):
         self.model_metrics =\
             self.genarate_metrics(train_data, train_labels, validation_data,
-                                  validation_labels, test_data, test_labels)
+                                  validation_labels, test_data, test_labels,
+                                  store_folders)
         self.model_structure = self.genarate_model_structure()
+        self.model_complexity = self.genarate_model_complexity()
 
     def genarate_metrics(self, train_data, train_labels, validation_data,
-                         validation_labels, test_data, test_labels):
-        train_metrics =\
-            self.metrics.eval_model_metrics(train_data, train_labels)
-        validation_metrics =\
-            self.metrics.eval_model_metrics(validation_data, validation_labels)
-        test_metrics = self.metrics.eval_model_metrics(test_data, test_labels)
-
-        train_loss = self.model.evaluate(train_data, train_labels)
-        validation_loss =\
-            self.model.evaluate(validation_data, validation_labels)
-        test_loss = self.model.evaluate(test_data, test_labels)
+                         validation_labels, test_data, test_labels,
+                         store_folders=None):
+        if store_folders is None:
+            store_folders = {}
+
+        train_metrics, train_loss =\
+            self.evaluate_split(train_data, train_labels,
+                                store_folders.get('train'))
+        validation_metrics, validation_loss =\
+            self.evaluate_split(validation_data, validation_labels,
+                                store_folders.get('validation'))
+        test_metrics, test_loss =\
+            self.evaluate_split(test_data, test_labels,
+                                store_folders.get('test'))
 
         metrics = self.get_metrics_values(train_metrics, validation_metrics,
                                           test_metrics, train_loss,
@@ -456,6 +756,48 @@ class YOLO:
 
         return metrics
 
+    def evaluate_split(self, data, labels, store_folders=None):
+        raw_predict = self.predict_raw(data, store_folders)
+
+        metrics = self.metrics.eval_raw_metrics(raw_predict, labels)
+        loss = self.evaluate_raw(raw_predict, labels)
+
+        return metrics, loss
+
+    def evaluate_raw(self, raw_predict, labels):
+        loss_function = self.get_loss_function()
+
+        loss = 0
+
+        for start in range(0, raw_predict.shape[0], self.batch_size):
+            end = start + self.batch_size
+
+            batch_predict = raw_predict[start:end]
+            batch_labels = np.asarray(labels[start:end], dtype=np.float32)
+
+            batch_loss, = loss_function([batch_labels, batch_predict])
+
+            loss += batch_loss * batch_predict.shape[0]
+
+        return self.metrics.save_div(float(loss), raw_predict.shape[0])
+
+    def get_loss_function(self):
+        if self.loss_function is None:
+            self.loss_function = self.create_loss_function()
+
+        return self.loss_function
+
+    def create_loss_function(self):
+        shape = (None, self.grid_size, self.grid_size,
+                 (self.number_of_annotations + 1))
+
+        true = tf.placeholder(tf.float32, shape=shape, name='loss_true')
+        pred = tf.placeholder(tf.float32, shape=shape, name='loss_pred')
+
+        loss = self.custom_loss(true, pred)
+
+        return K.function([true, pred], [loss])
+
     def genarate_model_structure(self):
         model_structure = []
         self.model.summary(print_fn=lambda row: model_structure.append(row))
@@ -463,6 +805,76 @@ class YOLO:
 
         return model_structure
 
+    def genarate_model_complexity(self):
+        model_complexity = {'width_multiplier': self.width_multiplier,
+                            'separable': self.separable,
+                            'reduced_head': self.reduced_head,
+                            'parameters': self.model.count_params(),
+                            'flops': self.count_flops(),
+                            'latency': self.measure_latency()}
+
+        return model_complexity
+
+    def count_flops(self):
+        flops = 0
+
+        for layer in self.model.layers:
+            if isinstance(layer, SeparableConv2D):
+                _, height, width, _ = layer.output_shape
+
+                flops += 2 * height * width *\
+                    (np.prod(K.int_shape(layer.depthwise_kernel)) +
+                     np.prod(K.int_shape(layer.pointwise_kernel)))
+            elif isinstance(layer, Conv2D):
+                _, height, width, _ = layer.output_shape
+
+                flops += 2 * height * width *\
+                    np.prod(K.int_shape(layer.kernel))
+
+        return int(flops)
+
+    def measure_latency(self, repeats=20):
+        image = np.zeros(shape=(1, self.image_size, self.image_size,
+                                self.color_channels), dtype=np.float32)
+
+        model_json = self.model.to_json()
+        weights = self.model.get_weights()
+
+        session_config = create_session_config(self.runtime)
+        session_config.device_count['GPU'] = 0
+
+        graph = tf.Graph()
+
+        try:
+            with graph.as_default(),\
+                    tf.Session(graph=graph, config=session_config) as sess:
+                K.set_session(sess)
+
+                model = model_from_json(model_json)
+                model.set_weights(weights)
+
+                model.predict(image)
+
+                start_time = datetime.now()
+
+                for _ in range(repeats):
+                    model.predict(image)
+
+                end_time = datetime.now()
+        finally:
+            K.set_session(get_session(self.runtime))
+
+        return (end_time - start_time) / repeats
+
+    def measure_throughput(self, images):
+        start_time = datetime.now()
+
+        self.predict_images(images)
+
+        end_time = datetime.now()
+
+        return images.shape[0] / (end_time - start_time).total_seconds()
+
     def get_metrics_values(self, train_metrics, validation_metrics,
                            test_metrics, train_loss, validation_loss,
                            test_loss):
@@ -495,6 +907,9 @@ class YOLO:
     def get_model_structure(self):
         return self.model_structure
 
+    def get_model_complexity(self):
+        return self.model_complexity
+
     def get_model_history(self):
         return {**self.history.history,
                 **self.metrics.get_validation_metrics()}
@@ -0,0 +1,93 @@
+import numpy as np
+
+
+class NonMaxSuppression:
+    """
+        Class for greedy non-max suppression of predicted boxes in NumPy
+    """
+
+    def __init__(self, config):
+        self.iou_threshold = config['network']['predict']['iou_threshold']
+        self.prob_threshold = config['network']['predict']['prob_threshold']
+
+        self.grid_size = config['label_info']['grid_size']
+        self.max_boxes = self.grid_size ** 2
+
+    def suppress(self, predict):
+        predict = predict[predict[:, 4] > self.prob_threshold]
+
+        order = np.argsort(-predict[:, 4], kind='mergesort')
+        predict = predict[order]
+
+        iou = self.boxes_iou_matrix(predict[:, :4])
+
+        keep = np.zeros(predict.shape[0], dtype=np.bool_)
+        suppressed = np.zeros(predict.shape[0], dtype=np.bool_)
+
+        for box in range(predict.shape[0]):
+            if suppressed[box]:
+                continue
+
+            keep[box] = True
+            if np.count_nonzero(keep) == self.max_boxes:
+                break
+
+            suppressed |= iou[box] > self.iou_threshold
+
+        return predict[keep]
+
+    def suppress_batch(self, predictions, max_boxes=None):
+        if max_boxes is None:
+            max_boxes = self.max_boxes
+
+        batch_size, boxes_number = predictions.shape[:2]
+        batch_indexes = np.arange(batch_size)[:, None]
+
+        order = np.argsort(-predictions[:, :, 4], axis=1, kind='mergesort')
+        predictions = predictions[batch_indexes, order]
+
+        iou = self.boxes_iou_matrix(predictions[:, :, :4])
+
+        keep = np.zeros((batch_size, boxes_number), dtype=np.bool_)
+        suppressed = predictions[:, :, 4] <= self.prob_threshold
+
+        for box in range(boxes_number):
+            keep[:, box] = ~suppressed[:, box]
+
+            suppressed |=\
+                keep[:, box, None] & (iou[:, box] > self.iou_threshold)
+
+        positions = np.cumsum(keep, axis=1) - 1
+        keep &= positions < max_boxes
+
+        true_boxes = np.zeros((batch_size, max_boxes, predictions.shape[2]),
+                              dtype=predictions.dtype)
+
+        rows, columns = np.nonzero(keep)
+        true_boxes[rows, positions[rows, columns]] = predictions[rows, columns]
+
+        counts = np.count_nonzero(keep, axis=1)
+
+        return true_boxes, counts
+
+    def boxes_iou_matrix(self, boxes):
+        ymin = np.minimum(boxes[..., 0], boxes[..., 2])
+        xmin = np.minimum(boxes[..., 1], boxes[..., 3])
+        ymax = np.maximum(boxes[..., 0], boxes[..., 2])
+        xmax = np.maximum(boxes[..., 1], boxes[..., 3])
+
+        area = (ymax - ymin) * (xmax - xmin)
+
+        ymin_inter = np.maximum(ymin[..., :, None], ymin[..., None, :])
+        xmin_inter = np.maximum(xmin[..., :, None], xmin[..., None, :])
+        ymax_inter = np.minimum(ymax[..., :, None], ymax[..., None, :])
+        xmax_inter = np.minimum(xmax[..., :, None], xmax[..., None, :])
+
+        area_inter = (np.maximum(ymax_inter - ymin_inter, 0.0) *
+                      np.maximum(xmax_inter - xmin_inter, 0.0))
+        area_union = area[..., :, None] + area[..., None, :] - area_inter
+
+        iou = np.zeros(area_inter.shape, dtype=np.float32)
+        np.divide(area_inter, area_union, out=iou, where=area_union > 0)
+
+        return iou
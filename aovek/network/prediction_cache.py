@@ -0,0 +1,135 @@
+import os
+import json
+import glob
+import hashlib
+import numpy as np
+
+from aovek.utils.dataset_store import DatasetStore
+
+
+class PredictionCache:
+    """
+        Class for caching raw network outputs of dataset splits on disk
+    """
+
+    def __init__(self, config):
+        self.enabled = config['network']['prediction_cache']['enabled']
+        self.cache_folder = config['network']['prediction_cache']['folder']
+        self.max_size =\
+            config['network']['prediction_cache']['max_size_mb'] * 2 ** 20
+
+        self.image_info = config['image_info']
+        self.label_info = config['label_info']
+
+    def get_key(self, weights_hash, store_folders):
+        return self.get_dataset_hash(store_folders), weights_hash
+
+    def get_dataset_hash(self, store_folders):
+        stores = []
+
+        for store_folder in store_folders:
+            store = DatasetStore(store_folder)
+            manifest = store.read_manifest()
+
+            shards = []
+            for shard in manifest['shards']:
+                for shard_file in (shard['data'], shard['labels']):
+                    shard_stat = os.stat(os.path.join(store_folder,
+                                                      shard_file))
+                    shards.append([shard_file, shard_stat.st_size,
+                                   shard_stat.st_mtime_ns])
+
+            stores.append({'store_folder': os.path.abspath(store_folder),
+                           'manifest': manifest,
+                           'shards': shards})
+
+        key_values = {'stores': stores,
+                      'image_info': self.image_info,
+                      'label_info': self.label_info}
+        key_values = json.dumps(key_values, sort_keys=True)
+
+        return hashlib.sha1(key_values.encode('utf-8')).hexdigest()
+
+    def get_entry_file(self, key):
+        dataset_hash, weights_hash = key
+
+        return os.path.join(self.cache_folder, dataset_hash,
+                            weights_hash + '.npy')
+
+    def load(self, key, mmap_mode=None):
+        entry_file = self.get_entry_file(key)
+
+        try:
+            predictions = np.load(entry_file, mmap_mode=mmap_mode)
+            os.utime(entry_file)
+        except (OSError, ValueError) as e:
+            return None
+
+        return predictions
+
+    def save(self, key, predictions):
+        temp_entry_file = self.prepare_entry(key)
+
+        with open(temp_entry_file, 'wb') as f:
+            np.save(f, predictions)
+
+        os.replace(temp_entry_file, self.get_entry_file(key))
+
+        self.evict_entries(self.get_entry_file(key))
+
+    def create_entry(self, key, shape):
+        temp_entry_file = self.prepare_entry(key)
+
+        return np.lib.format.open_memmap(temp_entry_file, mode='w+',
+                                         dtype=np.float32, shape=shape)
+
+    def finish_entry(self, key, predictions):
+        predictions.flush()
+
+        os.replace(predictions.filename, self.get_entry_file(key))
+
+        self.evict_entries(self.get_entry_file(key))
+
+    def discard_entry(self, predictions):
+        temp_entry_file = predictions.filename
+
+        del predictions
+
+        try:
+            os.remove(temp_entry_file)
+        except OSError as e:
+            pass
+
+    def prepare_entry(self, key):
+        entry_file = self.get_entry_file(key)
+
+        os.makedirs(os.path.dirname(entry_file), exist_ok=True)
+
+        return '{}.{}.tmp'.format(entry_file, os.getpid())
+
+    def evict_entries(self, new_entry_file):
+        entry_files = glob.glob(os.path.join(self.cache_folder, '*', '*.npy'))
+
+        entries = []
+        for entry_file in entry_files:
+            try:
+                entry_stat = os.stat(entry_file)
+            except OSError as e:
+                continue
+
+            entries.append((entry_stat.st_mtime, entry_stat.st_size,
+                            entry_file))
+
+        cache_size = 0
+
+        for _, entry_size, entry_file in sorted(entries, reverse=True):
+            cache_size += entry_size
+
+            if cache_size <= self.max_size or\
+                    os.path.samefile(entry_file, new_entry_file):
+                continue
+
+            try:
+                os.remove(entry_file)
+            except OSError as e:
+                pass
@@ -0,0 +1,45 @@
+import json
+import numpy as np
+import tensorflow as tf
+
+from aovek.network.session import create_session_config
+
+
+class QuantizedModel:
+    """
+        Class for running quantized frozen graph with keras-like predict
+    """
+
+    def __init__(self, model_file, runtime, batch_size):
+        with open(model_file + '.json') as f:
+            metadata = json.load(f)
+
+        graph_def = tf.GraphDef()
+        with open(model_file, 'rb') as f:
+            graph_def.ParseFromString(f.read())
+
+        self.graph = tf.Graph()
+        with self.graph.as_default():
+            tf.import_graph_def(graph_def, name='')
+
+        self.sess = tf.Session(graph=self.graph,
+                               config=create_session_config(runtime))
+
+        self.input = self.graph.get_tensor_by_name(metadata['input'] + ':0')
+        self.output = self.graph.get_tensor_by_name(metadata['output'] + ':0')
+
+        self.output_shape = tuple(metadata['output_shape'])
+
+        self.batch_size = batch_size
+
+    def predict(self, images):
+        predict = np.empty(shape=((images.shape[0],) + self.output_shape[1:]),
+                           dtype=np.float32)
+
+        for start in range(0, images.shape[0], self.batch_size):
+            end = start + self.batch_size
+
+            predict[start:end] = self.sess.run(
+                self.output, feed_dict={self.input: images[start:end]})
+
+        return predict
@@ -0,0 +1,38 @@
+import os
+import tensorflow as tf
+from keras import backend as K
+
+sess = None
+
+
+def get_session(runtime=None):
+    global sess
+
+    if sess is None:
+        sess = tf.Session(config=create_session_config(runtime))
+        K.set_session(sess)
+
+    return sess
+
+
+def create_session_config(runtime=None):
+    session_config = tf.ConfigProto()
+
+    if runtime is None:
+        return session_config
+
+    if runtime['cpu_affinity']:
+        os.sched_setaffinity(0, runtime['cpu_affinity'])
+
+    session_config.intra_op_parallelism_threads =\
+        runtime['intra_op_parallelism_threads']
+    session_config.inter_op_parallelism_threads =\
+        runtime['inter_op_parallelism_threads']
+    session_config.use_per_session_threads =\
+        runtime['use_per_session_threads']
+
+    session_config.gpu_options.allow_growth = runtime['allow_growth']
+    session_config.gpu_options.per_process_gpu_memory_fraction =\
+        runtime['per_process_gpu_memory_fraction']
+
+    return session_config
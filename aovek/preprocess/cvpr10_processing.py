@@ -10,13 +10,13 @@ class CVPR10Processing(DataProcessing):
 
     def generate_dataset(self):
         for train_data in self.get_train():
-            self.update_pickle(self.train_pickle_name, train_data)
+            self.update_store(self.train_store, train_data)
 
         for validation_data in self.get_validation():
-            self.update_pickle(self.validation_pickle_name, validation_data)
+            self.update_store(self.validation_store, validation_data)
 
         for test_data in self.get_test():
-            self.update_pickle(self.test_pickle_name, test_data)
+            self.update_store(self.test_store, test_data)
 
     def get_train(self):
         for annotation in self.train_annotations:
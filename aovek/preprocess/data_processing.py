@@ -1,16 +1,19 @@
 import os
 import numpy as np
-import pickle
 from PIL import Image
 from datetime import datetime
+from multiprocessing import Pool
 import json
 
 from aovek.utils.image_processing import ImageProcessing
+from aovek.utils.dataset_store import DatasetStore
+from aovek.preprocess.preprocess_cache import PreprocessCache
+from aovek.validate.metrics import Metrics
 
 
 class DataProcessing(ImageProcessing):
     """
-        Class for processing data and loading it to pickle file
+        Class for processing data and writing it to dataset store
     """
 
     def __init__(self, config):
@@ -37,54 +40,53 @@ class DataProcessing(ImageProcessing):
 
         self.dataset_folder = config['dataset'][dataset]['folder']
 
-        self.train_pickle_name =\
-            config['dataset'][dataset]['pickle_name']['train']
-        self.validation_pickle_name =\
-            config['dataset'][dataset]['pickle_name']['validation']
-        self.test_pickle_name =\
-            config['dataset'][dataset]['pickle_name']['test']
+        self.train_store =\
+            DatasetStore(config['dataset'][dataset]['store_folder']['train'])
+        self.validation_store =\
+            DatasetStore(config['dataset'][dataset]['store_folder']
+                         ['validation'])
+        self.test_store =\
+            DatasetStore(config['dataset'][dataset]['store_folder']['test'])
 
         self.grid_size = config['label_info']['grid_size']
         self.number_of_annotations =\
             config['label_info']['number_of_annotations']
 
+        self.workers = config['preprocessing']['workers'] or os.cpu_count()
+        self.chunk_size = config['preprocessing']['chunk_size']
+
+        self.cache = None
+        if config['preprocessing']['cache_folder']:
+            self.cache = PreprocessCache(config)
+
         self.time = None
 
-    def pickle_dataset(self):
+    def store_dataset(self):
         start_time = datetime.now()
 
-        self.create_pickle()
+        self.create_stores()
 
         self.generate_dataset()
 
         end_time = datetime.now()
         self.time = end_time - start_time
 
-    def create_pickle(self):
-        self.write_start_values(self.train_pickle_name)
-        self.write_start_values(self.validation_pickle_name)
-        self.write_start_values(self.test_pickle_name)
-
-    def write_start_values(self, pickle_file):
-        with open(pickle_file, 'wb') as f:
-            dataset_template =\
-                {'data':
-                    np.ndarray(shape=(0, self.image_size, self.image_size,
-                                      self.color_channels), dtype=np.float32),
-                 'labels': np.ndarray(shape=(0, self.grid_size, self.grid_size,
-                                             (1 + self.number_of_annotations)),
-                                      dtype=np.float32)}
-            pickle.dump(dataset_template, f, pickle.HIGHEST_PROTOCOL)
-
-    def update_pickle(self, pickle_file, data):
-        print('\n+')
-        with open(pickle_file, 'rb') as f:
-            dataset = pickle.load(f)
-            for k, v in data.items():
-                dataset[k] = np.concatenate((dataset[k], v))
+    def create_stores(self):
+        self.create_store(self.train_store)
+        self.create_store(self.validation_store)
+        self.create_store(self.test_store)
 
-        with open(pickle_file, 'wb') as f:
-            pickle.dump(dataset, f, pickle.HIGHEST_PROTOCOL)
+    def create_store(self, store):
+        store.create(data_shape=(self.image_size, self.image_size,
+                                 self.color_channels),
+                     data_dtype=self.storage_dtype,
+                     labels_shape=(self.grid_size, self.grid_size,
+                                   (1 + self.number_of_annotations)),
+                     labels_dtype=np.float32)
+
+    def update_store(self, store, data):
+        print('\n+')
+        store.append(data['data'], data['labels'])
         print('\\/')
 
     def get_images_path_from_images_info(self, images_info):
@@ -93,25 +95,73 @@ class DataProcessing(ImageProcessing):
         return image_files
 
     def get_images_and_labels(self, image_files, images_info):
-        images = np.ndarray(shape=(0, self.image_size, self.image_size,
-                                   self.color_channels), dtype=np.float32)
-        labels = np.ndarray(shape=(0, self.grid_size, self.grid_size,
-                                   (1 + self.number_of_annotations)),
-                            dtype=np.float32)
+        start_time = datetime.now()
+
+        image_items = [(image_file, images_info[image_file])
+                       for image_file in image_files]
 
-        for image_file in image_files:
+        images = np.empty(shape=(len(image_items), self.image_size,
+                                 self.image_size, self.color_channels),
+                          dtype=self.storage_dtype)
+        labels = np.empty(shape=(len(image_items), self.grid_size,
+                                 self.grid_size,
+                                 (1 + self.number_of_annotations)),
+                          dtype=np.float32)
+
+        for n, (image, label) in enumerate(self.process_images(image_items)):
             print(".", end='')
-            image, original_size =\
-                self.process_image(os.path.join(self.dataset_folder,
-                                                image_file))
 
-            image_info = images_info[image_file]
-            label = self.process_image_labels(image_info, original_size)
+            images[n] = image[0]
+            labels[n] = label[0]
+
+        self.print_processing_speed(len(image_items), start_time)
 
-            images = np.concatenate((images, image))
-            labels = np.concatenate((labels, label))
         return images, labels
 
+    def process_images(self, image_items):
+        if self.workers == 1:
+            for image_item in image_items:
+                yield self.process_image_and_label(image_item)
+        else:
+            with Pool(processes=self.workers, initializer=init_worker,
+                      initargs=(self,)) as pool:
+                for image, label in\
+                        pool.imap(process_image_in_worker, image_items,
+                                  chunksize=self.chunk_size):
+                    yield image, label
+
+    def process_image_and_label(self, image_item):
+        image_file, image_info = image_item
+        image_file = os.path.join(self.dataset_folder, image_file)
+
+        if self.cache is None:
+            return self.compute_image_and_label(image_file, image_info)
+
+        key = self.cache.get_key(image_file, image_info)
+
+        cache_entry = self.cache.load(key)
+        if cache_entry is not None:
+            return cache_entry
+
+        image, label = self.compute_image_and_label(image_file, image_info)
+        self.cache.save(key, image, label)
+
+        return image, label
+
+    def compute_image_and_label(self, image_file, image_info):
+        image, original_size = self.process_image(image_file)
+
+        label = self.process_image_labels(image_info, original_size)
+
+        return image, label
+
+    def print_processing_speed(self, images_number, start_time):
+        seconds = (datetime.now() - start_time).total_seconds()
+
+        print('\nProcessed {} images with {} workers: {:.2f} images/sec'
+              .format(images_number, self.workers,
+                      Metrics.save_div(images_number, seconds)))
+
     def process_image_labels(self, annotations, original_size):
         label = np.zeros((self.grid_size, self.grid_size,
                           (1 + self.number_of_annotations)))
@@ -161,11 +211,21 @@ class DataProcessing(ImageProcessing):
         return self.time
 
 
+def init_worker(data_processing):
+    global worker_data_processing
+
+    worker_data_processing = data_processing
+
+
+def process_image_in_worker(image_item):
+    return worker_data_processing.process_image_and_label(image_item)
+
+
 if __name__ == '__main__':
     with open('./config.json') as config_file:
         config = json.load(config_file)
 
     dp = DataProcessing(config)
-    dp.pickle_dataset()
+    dp.store_dataset()
 
     print('Taken time: {}'.format(str(dp.get_time())))
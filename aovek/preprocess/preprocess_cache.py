@@ -0,0 +1,49 @@
+import os
+import json
+import hashlib
+import numpy as np
+
+
+class PreprocessCache:
+    """
+        Class for caching processed images and labels on disk
+    """
+
+    def __init__(self, config):
+        self.cache_folder = config['preprocessing']['cache_folder']
+
+        self.image_info = config['image_info']
+        self.label_info = config['label_info']
+
+    def get_key(self, image_file, image_info):
+        image_stat = os.stat(image_file)
+
+        key_values = {'image_file': os.path.abspath(image_file),
+                      'size': image_stat.st_size,
+                      'mtime': image_stat.st_mtime_ns,
+                      'image_info': self.image_info,
+                      'label_info': self.label_info,
+                      'annotations': image_info}
+        key_values = json.dumps(key_values, sort_keys=True)
+
+        return hashlib.sha1(key_values.encode('utf-8')).hexdigest()
+
+    def get_entry_file(self, key):
+        return os.path.join(self.cache_folder, key[:2], key + '.npz')
+
+    def load(self, key):
+        try:
+            with np.load(self.get_entry_file(key)) as entry:
+                return entry['image'], entry['label']
+        except (OSError, KeyError, ValueError) as e:
+            return None
+
+    def save(self, key, image, label):
+        entry_file = self.get_entry_file(key)
+        os.makedirs(os.path.dirname(entry_file), exist_ok=True)
+
+        temp_entry_file = '{}.{}.tmp'.format(entry_file, os.getpid())
+        with open(temp_entry_file, 'wb') as f:
+            np.savez(f, image=image, label=label)
+
+        os.replace(temp_entry_file, entry_file)
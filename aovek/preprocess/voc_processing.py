@@ -21,16 +21,15 @@ class VOCProcessing(DataProcessing):
 
         test_images_info, images_info =\
             self.get_images_info_segment(images_info, 500)
-        self.generate_dataset_part(test_images_info, self.test_pickle_name)
+        self.generate_dataset_part(test_images_info, self.test_store)
 
         validation_images_info, images_info =\
             self.get_images_info_segment(images_info, 500)
         self.generate_dataset_part(validation_images_info,
-                                   self.validation_pickle_name)
+                                   self.validation_store)
 
         train_images_info = images_info
-        self.generate_dataset_part(train_images_info,
-                                   self.train_pickle_name)
+        self.generate_dataset_part(train_images_info, self.train_store)
 
     def get_images_info_segment(self, images_info, size):
         images_name = list(images_info.keys())
@@ -39,15 +38,14 @@ class VOCProcessing(DataProcessing):
 
         return images_info_segment, images_info
 
-    def generate_dataset_part(self, images_info, pickle_name):
-        with open(pickle_name.split('/')[-1].split('.')[0] + 'images.pickle',
-                  'wb') as f:
+    def generate_dataset_part(self, images_info, store):
+        with open(os.path.join(store.folder, 'images.pickle'), 'wb') as f:
             dataset_template =\
                 {'images': list(images_info.keys())}
             pickle.dump(dataset_template, f, pickle.HIGHEST_PROTOCOL)
 
         for test_data in self.get_segment(images_info):
-            self.update_pickle(pickle_name, test_data)
+            self.update_store(store, test_data)
 
     def get_segment(self, images_info):
         for images_info_segment in self.image_info_generator(images_info):
@@ -114,6 +112,6 @@ if __name__ == '__main__':
         config = json.load(config_file)
 
     dp = VOCProcessing(config)
-    dp.pickle_dataset()
+    dp.store_dataset()
 
     print('Taken time: {}'.format(str(dp.get_time())))
@@ -1,9 +1,11 @@
+import os
 import json
 from datetime import datetime
 from prettytable import PrettyTable
 
 from aovek.network.network import YOLO
 from aovek.utils.data_loading import DataLoading
+from aovek.validate.model_metrics import ModelMetrics
 
 
 class Train(DataLoading):
@@ -24,10 +26,16 @@ class Train(DataLoading):
 
         self.start_model = config['network']['train']['start_model']
 
+        self.distillation =\
+            config['network']['train']['distillation']['enabled']
+        self.teacher_model =\
+            config['network']['train']['distillation']['teacher_model']
+        self.distillation_metrics = None
+
     def load_dataset(self):
         start_time = datetime.now()
 
-        self.load_data()
+        self.load_data(splits=('train', 'validation'))
 
         end_time = datetime.now()
 
@@ -42,8 +50,16 @@ class Train(DataLoading):
         if self.start_model:
             self.network.load_model_file(self.start_model)
 
+        teacher = None
+        if self.distillation:
+            self.check_teacher_model()
+
+            teacher = YOLO(config)
+            teacher.load_model_file(self.teacher_model)
+
         self.network.train(self.train_data, self.train_labels,
-                           self.validation_data, self.validation_labels)
+                           self.validation_data, self.validation_labels,
+                           teacher=teacher)
 
         end_time = datetime.now()
         self.train_time = end_time - start_time
@@ -55,15 +71,69 @@ class Train(DataLoading):
 
         self.summary()
 
+        if teacher is not None:
+            self.distillation_summary(teacher)
+
         end_time = datetime.now()
         self.metrics_evaluation_time = end_time - start_time
 
+        self.release_data()
+
         self.log()
 
+    def check_teacher_model(self):
+        if os.path.abspath(self.teacher_model) ==\
+                os.path.abspath(self.network.model_binary_data_file):
+            raise ValueError('Teacher model {} would be overwritten by the '
+                             'trained student'.format(self.teacher_model))
+
     def summary(self):
         self.network.summary(self.train_data, self.train_labels,
                              self.validation_data, self.validation_labels,
-                             self.test_data, self.test_labels)
+                             self.test_data, self.test_labels,
+                             self.get_splits_store_folders())
+
+    def get_splits_store_folders(self):
+        return {split: self.get_store_folders(split)
+                for split in ('train', 'validation', 'test')}
+
+    def distillation_summary(self, teacher):
+        teacher_metrics = ModelMetrics(self.validation_data,
+                                       self.validation_labels, teacher)
+
+        validation_metrics =\
+            teacher_metrics.eval_model_metrics(
+                self.validation_data, self.validation_labels,
+                self.get_store_folders('validation'))
+        test_metrics =\
+            teacher_metrics.eval_model_metrics(
+                self.test_data, self.test_labels,
+                self.get_store_folders('test'))
+
+        student_metrics = self.network.get_metrics()
+
+        self.distillation_metrics = {
+            'Teacher': {
+                'parameters': teacher.model.count_params(),
+                'validation_iou': validation_metrics['iou'],
+                'validation_precision': validation_metrics['precision'],
+                'validation_recall': validation_metrics['recall'],
+                'validation_f1_score': validation_metrics['f1_score'],
+                'test_f1_score': test_metrics['f1_score'],
+                'throughput': teacher.measure_throughput(self.test_data)},
+            'Student': {
+                'parameters': self.network.model.count_params(),
+                'validation_iou':
+                    student_metrics['iou']['validation_iou'],
+                'validation_precision':
+                    student_metrics['precision']['validation_precision'],
+                'validation_recall':
+                    student_metrics['recall']['validation_recall'],
+                'validation_f1_score':
+                    student_metrics['f1_score']['validation_f1_score'],
+                'test_f1_score': student_metrics['f1_score']['test_f1_score'],
+                'throughput': self.network.measure_throughput(self.test_data)}
+        }
 
     def log(self):
         log_text = self.create_log_text()
@@ -98,6 +168,15 @@ _________________________________________________________________
 
         log_text += self.get_metrics_log()
 
+        log_text += '\n'
+
+        log_text += self.get_model_complexity_log()
+
+        if self.distillation_metrics is not None:
+            log_text += '\n'
+
+            log_text += self.get_distillation_log()
+
         log_text += self.get_time_log()
 
         self.print_log(log_text)
@@ -167,6 +246,54 @@ _________________________________________________________________
 
         return metrics_log
 
+    def get_model_complexity_log(self):
+        model_complexity = self.network.get_model_complexity()
+
+        temp_model_complexity = PrettyTable()
+
+        temp_model_complexity.add_column(
+            'Width Multiplier', [model_complexity['width_multiplier']])
+        temp_model_complexity.add_column(
+            'Separable', [model_complexity['separable']])
+        temp_model_complexity.add_column(
+            'Reduced Head', [model_complexity['reduced_head']])
+        temp_model_complexity.add_column(
+            'Parameters', [model_complexity['parameters']])
+        temp_model_complexity.add_column(
+            'FLOPs', [model_complexity['flops']])
+        temp_model_complexity.add_column(
+            'CPU Latency', [model_complexity['latency']])
+
+        model_complexity_log = str(temp_model_complexity)
+
+        return model_complexity_log
+
+    def get_distillation_log(self):
+        temp_distillation = PrettyTable()
+
+        temp_distillation.field_names = ['Model', 'Parameters',
+                                         'Validation IoU',
+                                         'Validation Precision',
+                                         'Validation Recall',
+                                         'Validation F1 Score',
+                                         'Test F1 Score', 'Frames/sec']
+
+        for model_type in ('Teacher', 'Student'):
+            metrics = self.distillation_metrics[model_type]
+
+            temp_distillation.add_row([model_type,
+                                       metrics['parameters'],
+                                       metrics['validation_iou'],
+                                       metrics['validation_precision'],
+                                       metrics['validation_recall'],
+                                       metrics['validation_f1_score'],
+                                       metrics['test_f1_score'],
+                                       metrics['throughput']])
+
+        distillation_log = str(temp_distillation)
+
+        return distillation_log
+
     def get_time_log(self):
         time_log = """
 _________________________________________________________________
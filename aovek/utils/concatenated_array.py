@@ -0,0 +1,109 @@
+import numpy as np
+
+
+class ConcatenatedArray:
+    """
+        Class for read-only view of arrays concatenated along first axis
+    """
+
+    def __init__(self, arrays):
+        self.arrays = arrays
+        self.offsets = np.cumsum([0] + [array.shape[0] for array in arrays])
+
+        dtypes = set(array.dtype for array in arrays)
+        if len(dtypes) > 1:
+            raise ValueError('Concatenated arrays have different dtypes: {}'
+                             .format(', '.join(sorted(dtype.name
+                                                      for dtype in dtypes))))
+
+        self.dtype = arrays[0].dtype
+        self.shape = (int(self.offsets[-1]),) + arrays[0].shape[1:]
+        self.ndim = len(self.shape)
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __array__(self, dtype=None):
+        array = self.get_range(0, len(self))
+
+        if dtype is not None:
+            array = array.astype(dtype, copy=False)
+
+        return array
+
+    def __getitem__(self, index):
+        if isinstance(index, tuple):
+            items = self[index[0]]
+
+            if np.ndim(index[0]) == 0 and not isinstance(index[0], slice):
+                return items[index[1:]]
+
+            return items[(slice(None),) + index[1:]]
+
+        if isinstance(index, (int, np.integer)):
+            return self.get_item(int(index))
+
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+
+            if step == 1:
+                return self.get_range(start, stop)
+
+            index = np.arange(start, stop, step)
+
+        return self.take(np.asarray(index))
+
+    def get_item(self, index):
+        if index < 0:
+            index += len(self)
+
+        if not 0 <= index < len(self):
+            raise IndexError('Index {} is out of bounds for size {}'
+                             .format(index, len(self)))
+
+        array_number = self.get_array_numbers(index)
+
+        return self.arrays[array_number][index - self.offsets[array_number]]
+
+    def get_range(self, start, stop):
+        parts = []
+
+        for array, offset in zip(self.arrays, self.offsets):
+            part_start = max(start - offset, 0)
+            part_stop = min(stop - offset, array.shape[0])
+
+            if part_start < part_stop:
+                parts.append(array[part_start:part_stop])
+
+        if not parts:
+            return np.empty(shape=((0,) + self.shape[1:]), dtype=self.dtype)
+        elif len(parts) == 1:
+            return parts[0]
+
+        return np.concatenate(parts)
+
+    def take(self, indexes):
+        if indexes.dtype == np.bool_:
+            indexes = np.flatnonzero(indexes)
+
+        indexes = np.where(indexes < 0, indexes + len(self), indexes)
+
+        if np.any((indexes < 0) | (indexes >= len(self))):
+            raise IndexError('Index is out of bounds for size {}'
+                             .format(len(self)))
+
+        items = np.empty(shape=((indexes.shape[0],) + self.shape[1:]),
+                         dtype=self.dtype)
+
+        array_numbers = self.get_array_numbers(indexes)
+
+        for array_number in np.unique(array_numbers):
+            mask = array_numbers == array_number
+
+            items[mask] = self.arrays[array_number][
+                indexes[mask] - self.offsets[array_number]]
+
+        return items
+
+    def get_array_numbers(self, indexes):
+        return np.searchsorted(self.offsets, indexes, side='right') - 1
@@ -1,6 +1,8 @@
-import pickle
 import numpy as np
 
+from aovek.utils.dataset_store import DatasetStore
+from aovek.utils.concatenated_array import ConcatenatedArray
+
 
 class DataLoading:
 
@@ -11,57 +13,154 @@ class DataLoading:
         self.number_of_annotations =\
             config['label_info']['number_of_annotations']
 
-        self.train_pickle_names = []
-        self.validation_pickle_names = []
-        self.test_pickle_names = []
+        self.storage_dtype = np.dtype(config['image_info']['storage_dtype'])
+        self.loading_backend = config['data_loading']['backend']
+
+        self.train_store_folders = []
+        self.validation_store_folders = []
+        self.test_store_folders = []
 
         self.get_datasets(config)
 
-        self.train_data = None
-        self.train_labels = None
-        self.validation_data = None
-        self.validation_labels = None
-        self.test_data = None
-        self.test_labels = None
+        self.splits = {}
 
     def get_datasets(self, config):
         for dataset in config['dataset']['dataset']:
-            self.train_pickle_names.append(
-                config['dataset'][dataset]['pickle_name']['train'])
-            self.validation_pickle_names.append(
-                config['dataset'][dataset]['pickle_name']['validation'])
-            self.test_pickle_names.append(
-                config['dataset'][dataset]['pickle_name']['test'])
-
-    def load_data(self):
-        self.train_data, self.train_labels =\
-            self.load_pickle(self.train_pickle_names)
-        self.validation_data, self.validation_labels =\
-            self.load_pickle(self.validation_pickle_names)
-        self.test_data, self.test_labels =\
-            self.load_pickle(self.test_pickle_names)
-
-    def load_pickle(self, pickle_names):
-        data = np.ndarray(shape=(0, self.image_size, self.image_size,
-                                 self.color_channels), dtype=np.float32)
-        labels = np.ndarray(shape=(0, self.grid_size, self.grid_size,
-                                   (1 + self.number_of_annotations)),
-                            dtype=np.float32)
-
-        for pickle_name in pickle_names:
-            new_data, new_labels = self.get_data_from_pickle(pickle_name)
-
-            data =\
-                np.concatenate((data, new_data))
-            labels =\
-                np.concatenate((labels, new_labels))
+            self.train_store_folders.append(
+                config['dataset'][dataset]['store_folder']['train'])
+            self.validation_store_folders.append(
+                config['dataset'][dataset]['store_folder']['validation'])
+            self.test_store_folders.append(
+                config['dataset'][dataset]['store_folder']['test'])
+
+    def load_data(self, splits=('train', 'validation', 'test')):
+        for split in splits:
+            self.get_split(split)
+
+    def get_split(self, split):
+        if split not in self.splits:
+            self.splits[split] =\
+                self.load_store(self.get_store_folders(split))
+
+        return self.splits[split]
+
+    def release_split(self, split):
+        self.splits.pop(split, None)
+
+    def release_data(self):
+        self.splits = {}
+
+    def get_store_folders(self, split):
+        if split == 'train':
+            return self.train_store_folders
+        elif split == 'validation':
+            return self.validation_store_folders
+        elif split == 'test':
+            return self.test_store_folders
+
+        raise ValueError('Unknown dataset split: {}'.format(split))
+
+    def iterate_split(self, split, batch_size):
+        for store_folder in self.get_store_folders(split):
+            store = DatasetStore(store_folder)
+
+            for data, labels in store.load_shards(mmap_mode='r'):
+                for start in range(0, data.shape[0], batch_size):
+                    end = start + batch_size
+
+                    yield data[start:end], labels[start:end]
+
+    def get_split_size(self, split):
+        return sum(DatasetStore(store_folder).get_size()
+                   for store_folder in self.get_store_folders(split))
+
+    @property
+    def train_data(self):
+        return self.get_split('train')[0]
+
+    @property
+    def train_labels(self):
+        return self.get_split('train')[1]
+
+    @property
+    def validation_data(self):
+        return self.get_split('validation')[0]
+
+    @property
+    def validation_labels(self):
+        return self.get_split('validation')[1]
+
+    @property
+    def test_data(self):
+        return self.get_split('test')[0]
+
+    @property
+    def test_labels(self):
+        return self.get_split('test')[1]
+
+    def load_store(self, store_folders):
+        stores = [DatasetStore(store_folder) for store_folder in store_folders]
+
+        if self.loading_backend == 'memmap':
+            return self.map_stores(stores)
+
+        size = sum(store.get_size() for store in stores)
+        data_dtype = self.get_data_dtype(stores)
+
+        data = np.empty(shape=(size, self.image_size, self.image_size,
+                               self.color_channels), dtype=data_dtype)
+        labels = np.empty(shape=(size, self.grid_size, self.grid_size,
+                                 (1 + self.number_of_annotations)),
+                          dtype=np.float32)
+
+        start = 0
+        for store in stores:
+            for new_data, new_labels in store.load_shards():
+                end = start + new_data.shape[0]
+
+                data[start:end] = new_data
+                labels[start:end] = new_labels
+
+                start = end
 
         return data, labels
 
-    def get_data_from_pickle(self, pickle_name):
-        with open(pickle_name, 'rb') as dsp:
-            dataset = pickle.load(dsp)
-            data = dataset['data']
-            labels = dataset['labels']
-            del dataset
+    def get_data_dtype(self, stores):
+        data_dtypes = set(store.get_data_dtype() for store in stores)
+
+        if len(data_dtypes) > 1:
+            raise ValueError('Dataset stores have different data dtypes: {}'
+                             .format(', '.join(sorted(dtype.name for dtype
+                                                      in data_dtypes))))
+        elif not data_dtypes:
+            return self.storage_dtype
+
+        return data_dtypes.pop()
+
+    def map_stores(self, stores):
+        data_dtype = self.get_data_dtype(stores)
+
+        data = []
+        labels = []
+
+        for store in stores:
+            for new_data, new_labels in store.load_shards(mmap_mode='r'):
+                data.append(new_data)
+                labels.append(new_labels)
+
+        data = self.concatenate_view(data, (self.image_size, self.image_size,
+                                            self.color_channels), data_dtype)
+        labels = self.concatenate_view(labels,
+                                       (self.grid_size, self.grid_size,
+                                        (1 + self.number_of_annotations)),
+                                       np.float32)
+
         return data, labels
+
+    def concatenate_view(self, arrays, item_shape, dtype):
+        if not arrays:
+            return np.empty(shape=((0,) + item_shape), dtype=dtype)
+        elif len(arrays) == 1:
+            return arrays[0]
+
+        return ConcatenatedArray(arrays)
@@ -0,0 +1,44 @@
+import math
+import numpy as np
+from keras.utils import Sequence
+
+
+class DatasetSequence(Sequence):
+    """
+        Class for feeding normalized batches from dataset arrays to keras
+    """
+
+    def __init__(self, data, labels, batch_size, image_processing,
+                 shuffle=False):
+        self.data = data
+        self.labels = labels
+
+        self.batch_size = batch_size
+        self.image_processing = image_processing
+
+        self.shuffle = shuffle
+
+        self.indexes = np.arange(self.data.shape[0])
+        self.on_epoch_end()
+
+    def __len__(self):
+        return int(math.ceil(self.data.shape[0] / self.batch_size))
+
+    def __getitem__(self, batch_number):
+        batch_indexes = self.get_batch_indexes(batch_number)
+
+        batch_data = self.image_processing.normalize_batch(
+            self.data[batch_indexes])
+        batch_labels = self.labels[batch_indexes]
+
+        return batch_data, batch_labels
+
+    def get_batch_indexes(self, batch_number):
+        start = batch_number * self.batch_size
+        end = start + self.batch_size
+
+        return np.sort(self.indexes[start:end])
+
+    def on_epoch_end(self):
+        if self.shuffle:
+            np.random.shuffle(self.indexes)
@@ -0,0 +1,108 @@
+import os
+import json
+import numpy as np
+
+
+class DatasetStore:
+    """
+        Class for append-only dataset storage in .npy shards with manifest
+    """
+
+    manifest_name = 'manifest.json'
+
+    def __init__(self, folder):
+        self.folder = folder
+        self.manifest_file = os.path.join(folder, self.manifest_name)
+
+    def create(self, data_shape, data_dtype, labels_shape, labels_dtype):
+        os.makedirs(self.folder, exist_ok=True)
+
+        if self.exists():
+            self.remove_shards()
+
+        manifest = {'data': {'shape': list(data_shape),
+                             'dtype': np.dtype(data_dtype).name},
+                    'labels': {'shape': list(labels_shape),
+                               'dtype': np.dtype(labels_dtype).name},
+                    'shards': []}
+
+        self.write_manifest(manifest)
+
+    def append(self, data, labels):
+        manifest = self.read_manifest()
+
+        shard_number = len(manifest['shards'])
+        data_file = 'data_{:05d}.npy'.format(shard_number)
+        labels_file = 'labels_{:05d}.npy'.format(shard_number)
+
+        data = self.check_array(data, manifest['data'])
+        labels = self.check_array(labels, manifest['labels'])
+
+        if data.shape[0] != labels.shape[0]:
+            raise ValueError('Data and labels have different size: {} != {}'
+                             .format(data.shape[0], labels.shape[0]))
+
+        np.save(os.path.join(self.folder, data_file), data)
+        np.save(os.path.join(self.folder, labels_file), labels)
+
+        manifest['shards'].append({'data': data_file,
+                                   'labels': labels_file,
+                                   'size': int(data.shape[0])})
+
+        self.write_manifest(manifest)
+
+    def check_array(self, array, array_info):
+        if list(array.shape[1:]) != array_info['shape']:
+            raise ValueError('Shard shape {} does not match store shape {}'
+                             .format(list(array.shape[1:]),
+                                     array_info['shape']))
+
+        return np.ascontiguousarray(array, dtype=array_info['dtype'])
+
+    def remove_shards(self):
+        manifest = self.read_manifest()
+
+        for shard in manifest['shards']:
+            for shard_file in (shard['data'], shard['labels']):
+                try:
+                    os.remove(os.path.join(self.folder, shard_file))
+                except OSError as e:
+                    pass
+
+    def exists(self):
+        return os.path.isfile(self.manifest_file)
+
+    def read_manifest(self):
+        with open(self.manifest_file) as f:
+            manifest = json.load(f)
+
+        return manifest
+
+    def write_manifest(self, manifest):
+        temp_manifest_file = self.manifest_file + '.tmp'
+
+        with open(temp_manifest_file, 'w') as f:
+            json.dump(manifest, f, indent=4)
+
+        os.replace(temp_manifest_file, self.manifest_file)
+
+    def get_data_dtype(self):
+        manifest = self.read_manifest()
+
+        return np.dtype(manifest['data']['dtype'])
+
+    def get_size(self):
+        manifest = self.read_manifest()
+
+        return sum(shard['size'] for shard in manifest['shards'])
+
+    def load_shards(self, mmap_mode=None):
+        manifest = self.read_manifest()
+
+        for shard in manifest['shards']:
+            data = np.load(os.path.join(self.folder, shard['data']),
+                           mmap_mode=mmap_mode)
+            labels = np.load(os.path.join(self.folder, shard['labels']),
+                             mmap_mode=mmap_mode)
+
+            yield data, labels
@@ -11,6 +11,7 @@ class ImageProcessing:
         self.color_channels = config['image_info']['color_channels']
         self.color_mode = config['image_info']['color_mode']
         self.normalizer = config['image_info']['normalizer']
+        self.storage_dtype = np.dtype(config['image_info']['storage_dtype'])
 
     def process_image(self, image_file):
         image_data =\
@@ -25,16 +26,25 @@ class ImageProcessing:
                                 self.color_channels):
             image = resize(image_data,
                            output_shape=(self.image_size, self.image_size),
-                           mode='constant')
+                           mode='constant', preserve_range=True)
         else:
             image = image_data
 
         image = np.expand_dims(image, axis=0)
 
-        image = self.normalize_image(image)
+        if self.storage_dtype == np.uint8:
+            image = self.quantize_image(image)
+        else:
+            image = self.normalize_image(image)
 
         return (image, original_size)
 
+    def quantize_image(self, image):
+        quantized_image =\
+            np.clip(np.round(image), 0, self.pixel_depth).astype(np.uint8)
+
+        return quantized_image
+
     def load_image(self, image_file):
         image = ndimage.imread(image_file, mode='RGB').astype(float)
 
@@ -42,6 +52,14 @@ class ImageProcessing:
 
         return image
 
+    def normalize_batch(self, batch):
+        if batch.dtype != np.uint8:
+            return batch
+
+        normalized_batch = self.normalize_image(batch.astype(np.float32))
+
+        return normalized_batch
+
     def normalize_image(self, image):
         if self.normalizer == '[0, 255]':
             image = self.normalize_image_without_normalization(image)
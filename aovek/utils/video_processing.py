@@ -1,4 +1,5 @@
 import skvideo.io
+import skvideo.utils
 import numpy as np
 from skimage.transform import resize
 
@@ -10,21 +11,36 @@ class VideoProcessing(ImageProcessing):
     def __init__(self, config):
         super().__init__(config)
 
-    def process_video(self, video_path):
-        video = skvideo.io.vread(video_path)
+        self.chunk_size = config['video_info']['chunk_size']
 
-        return video
+    def read_video_chunks(self, video_path):
+        frames = []
 
-    def resize_video(self, video_path):
-        video = skvideo.io.vread(video_path, as_grey=True)
+        for frame in skvideo.io.vreader(video_path):
+            frames.append(frame)
 
+            if len(frames) == self.chunk_size:
+                yield self.process_video_chunk(frames)
+                frames = []
+
+        if frames:
+            yield self.process_video_chunk(frames)
+
+    def process_video_chunk(self, frames):
+        video = np.array(frames)
+
+        resized_video = self.resize_frames(skvideo.utils.rgb2gray(video))
+
+        return video, resized_video
+
+    def resize_frames(self, video):
         video = self.normalize_image(video)
 
         resized_video =\
-            np.ndarray(shape=(0, self.image_size, self.image_size,
-                              self.color_channels), dtype=np.float32)
+            np.empty(shape=(video.shape[0], self.image_size, self.image_size,
+                            self.color_channels), dtype=np.float32)
 
-        for frame in video:
+        for n, frame in enumerate(video):
             frame_data = np.squeeze(frame, axis=2)
 
             processed_frame =\
@@ -32,12 +48,9 @@ class VideoProcessing(ImageProcessing):
                        output_shape=(self.image_size, self.image_size),
                        mode='constant')
 
-            processed_frame = np.expand_dims(processed_frame, axis=0)
-            processed_frame = np.expand_dims(processed_frame, axis=3)
-
-            resized_video = np.concatenate((resized_video, processed_frame))
+            resized_video[n] = np.expand_dims(processed_frame, axis=2)
 
         return resized_video
 
-    def write_video(self, video, path):
-        skvideo.io.vwrite(path, video)
+    def create_video_writer(self, path):
+        return skvideo.io.FFmpegWriter(path)
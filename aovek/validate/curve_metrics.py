@@ -0,0 +1,189 @@
+import numpy as np
+from prettytable import PrettyTable
+
+from aovek.validate.metrics import Metrics
+from aovek.network.non_max_suppression import NonMaxSuppression
+
+
+class CurveMetrics(Metrics):
+    """
+        Class for precision/recall curves and AP from one inference pass
+    """
+
+    def __init__(self, config):
+        super().__init__(config)
+
+        self.curve_iou_thresholds =\
+            config['network']['predict']['curve_iou_thresholds']
+        self.curve_score_bins =\
+            config['network']['predict']['curve_score_bins']
+
+        self.curve_nms = NonMaxSuppression(config)
+        self.curve_nms.prob_threshold = -np.inf
+
+    def eval_metrics_and_curves(self, images, labels, store_folders=None):
+        raw_preds = self.network.predict_raw(images, store_folders)
+
+        return self.eval_raw_metrics_and_curves(raw_preds, labels)
+
+    def eval_raw_metrics_and_curves(self, raw_preds, labels):
+        accumulator = self.create_accumulator()
+
+        self.accumulate(accumulator, raw_preds, labels)
+
+        return self.get_accumulated_metrics_and_curves(accumulator)
+
+    def create_accumulator(self):
+        return {'iou': 0, 'gt_num': 0, 'tp': 0, 'fp': 0, 'fn': 0,
+                'pred_histogram': np.zeros(self.curve_score_bins,
+                                           dtype=np.int64),
+                'gt_histograms': {iou_threshold:
+                                  np.zeros(self.curve_score_bins,
+                                           dtype=np.int64)
+                                  for iou_threshold
+                                  in self.curve_iou_thresholds}}
+
+    def accumulate(self, accumulator, raw_preds, labels):
+        labels = np.reshape(labels, (-1, self.grid_size ** 2,
+                                     (self.number_of_annotations + 1)))
+        labels = self.get_corners_from_labels(labels)
+
+        detections = self.suppress_raw_predictions(raw_preds, self.curve_nms)
+
+        preds = self.filter_detections(detections, self.prob_threshold)
+
+        iou, gt_num, tp, fp, fn = self.get_metrics_params(labels, preds)
+
+        accumulator['iou'] += iou
+        accumulator['gt_num'] += gt_num
+        accumulator['tp'] += tp
+        accumulator['fp'] += fp
+        accumulator['fn'] += fn
+
+        pred_mask = ~np.all(detections == 0, axis=2)
+        accumulator['pred_histogram'] +=\
+            self.get_score_histogram(detections[:, :, 4][pred_mask])
+
+        for iou_threshold in self.curve_iou_thresholds:
+            gt_scores = self.get_gt_scores(labels, detections, pred_mask,
+                                           iou_threshold)
+
+            accumulator['gt_histograms'][iou_threshold] +=\
+                self.get_score_histogram(gt_scores[np.isfinite(gt_scores)])
+
+    def get_score_histogram(self, scores):
+        histogram, _ = np.histogram(np.clip(scores, 0, 1),
+                                    bins=self.curve_score_bins, range=(0, 1))
+
+        return histogram
+
+    def get_accumulated_metrics_and_curves(self, accumulator):
+        iou, precision, recall, f1_score =\
+            self.calculate_metrics(accumulator['iou'], accumulator['gt_num'],
+                                   accumulator['tp'], accumulator['fp'],
+                                   accumulator['fn'])
+
+        metrics = {'iou': iou, 'precision': precision, 'recall': recall,
+                   'f1_score': f1_score}
+
+        curves = {}
+
+        for iou_threshold in self.curve_iou_thresholds:
+            curves[iou_threshold] =\
+                self.get_curve(accumulator['pred_histogram'],
+                               accumulator['gt_histograms'][iou_threshold],
+                               accumulator['gt_num'])
+
+        return metrics, curves
+
+    def filter_detections(self, detections, prob_threshold):
+        keep = detections[:, :, 4] > prob_threshold
+
+        return detections * keep[:, :, np.newaxis]
+
+    def get_gt_scores(self, labels, detections, pred_mask, iou_threshold):
+        gt_scores = [np.empty(shape=(0,), dtype=np.float32)]
+
+        for start in range(0, labels.shape[0], self.metrics_batch_size):
+            end = start + self.metrics_batch_size
+
+            gt_mask = labels[start:end, :, 4] == 1
+
+            if detections.shape[1] == 0:
+                gt_scores.append(np.full(np.count_nonzero(gt_mask), -np.inf))
+                continue
+
+            iou_matrix = self.get_iou_matrix(labels[start:end],
+                                             detections[start:end])
+
+            matched = (iou_matrix >= iou_threshold) &\
+                pred_mask[start:end, np.newaxis, :]
+
+            scores = np.where(matched,
+                              detections[start:end, np.newaxis, :, 4],
+                              -np.inf)
+
+            gt_scores.append(np.max(scores, axis=2)[gt_mask])
+
+        return np.concatenate(gt_scores)
+
+    def get_curve(self, pred_histogram, gt_histogram, gt_num):
+        thresholds = np.linspace(0, 1, self.curve_score_bins + 1)[:-1]
+
+        detections_number = np.cumsum(pred_histogram[::-1])[::-1]
+        tp = np.cumsum(gt_histogram[::-1])[::-1]
+
+        has_detections = detections_number > 0
+
+        thresholds = thresholds[has_detections][::-1]
+        detections_number = detections_number[has_detections][::-1]
+        tp = tp[has_detections][::-1]
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            precision = tp / detections_number
+            recall = tp / gt_num
+            f1_score = (2 * precision * recall) / (precision + recall)
+
+        return {'thresholds': thresholds, 'precision': precision,
+                'recall': recall, 'f1_score': f1_score,
+                'ap': self.get_average_precision(precision, recall)}
+
+    def get_average_precision(self, precision, recall):
+        if precision.shape[0] == 0 or np.all(np.isnan(recall)):
+            return 0.0
+
+        precision = np.maximum.accumulate(precision[::-1])[::-1]
+        recall_steps = np.diff(np.append(0, recall))
+
+        return np.sum(recall_steps * precision)
+
+    def get_best_operating_point(self, curve):
+        if np.all(np.isnan(curve['f1_score'])):
+            return {'threshold': np.nan, 'precision': np.nan,
+                    'recall': np.nan, 'f1_score': np.nan}
+
+        best = np.nanargmax(curve['f1_score'])
+
+        return {'threshold': curve['thresholds'][best],
+                'precision': curve['precision'][best],
+                'recall': curve['recall'][best],
+                'f1_score': curve['f1_score'][best]}
+
+    def get_curves_table(self, curves):
+        table = PrettyTable()
+
+        table.field_names = ['IoU Threshold', 'AP', 'Best F1 Score',
+                             'Min Score', 'Precision', 'Recall']
+
+        for iou_threshold, curve in sorted(curves.items()):
+            best = self.get_best_operating_point(curve)
+
+            table.add_row([iou_threshold, curve['ap'], best['f1_score'],
+                           best['threshold'], best['precision'],
+                           best['recall']])
+
+        mean_ap = np.mean([curve['ap'] for curve in curves.values()])
+
+        table.add_row(['mAP', mean_ap, '', '', '', ''])
+
+        return table
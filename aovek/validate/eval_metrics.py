@@ -1,38 +1,93 @@
 import json
+from datetime import datetime
 
-from aovek.validate.metrics import Metrics
+from aovek.validate.curve_metrics import CurveMetrics
 from aovek.network.network import YOLO
 from aovek.utils.data_loading import DataLoading
 
 
-class EvalMetrics(Metrics, DataLoading):
+class EvalMetrics(CurveMetrics, DataLoading):
 
     def __init__(self, config):
-        Metrics.__init__(self, config)
+        CurveMetrics.__init__(self, config)
         DataLoading.__init__(self, config)
 
+        self.streaming_evaluation =\
+            config['network']['predict']['streaming_evaluation']
+
         self.network = YOLO(config)
         self.network.load_model()
 
-        self.load_data()
-
     def eval_pickles_metrics(self):
         print('Train:')
-        self.eval_dataset_metrics(self.train_data, self.train_labels)
+        self.eval_split_metrics('train')
 
         print('Validation:')
-        self.eval_dataset_metrics(self.validation_data, self.validation_labels)
+        self.eval_split_metrics('validation')
 
         print('Test:')
-        self.eval_dataset_metrics(self.test_data, self.test_labels)
+        self.eval_split_metrics('test')
+
+    def eval_split_metrics(self, split):
+        if self.streaming_evaluation:
+            self.eval_split_metrics_streaming(split)
+            return
+
+        data, labels = self.get_split(split)
+
+        self.eval_dataset_metrics(data, labels,
+                                  self.get_store_folders(split))
+
+        self.release_split(split)
+
+    def eval_dataset_metrics(self, data, labels, store_folders=None):
+        metrics, curves =\
+            self.eval_metrics_and_curves(data, labels, store_folders)
+
+        self.print_metrics_and_curves(metrics, curves)
+
+    def eval_split_metrics_streaming(self, split):
+        size = self.get_split_size(split)
+
+        batches = self.iterate_split(split, self.metrics_batch_size)
+        raw_batches =\
+            self.network.predict_raw_stream(batches, size,
+                                            self.get_store_folders(split))
 
-    def eval_dataset_metrics(self, data, labels):
-        metrics = self.eval_metrics(data, labels)
+        accumulator = self.create_accumulator()
 
+        start_time = datetime.now()
+        images_number = 0
+
+        for raw_preds, labels in raw_batches:
+            self.accumulate(accumulator, raw_preds, labels)
+
+            images_number += raw_preds.shape[0]
+
+            self.print_progress(images_number, size, start_time)
+
+        metrics, curves = self.get_accumulated_metrics_and_curves(accumulator)
+
+        print()
+        self.print_metrics_and_curves(metrics, curves)
+
+    def print_progress(self, images_number, size, start_time):
+        seconds = (datetime.now() - start_time).total_seconds()
+
+        images_per_second = self.save_div(images_number, seconds)
+        eta = self.save_div(size - images_number, images_per_second)
+
+        print('\r{}/{} images: {:.2f} images/sec, ETA: {:.0f}s'
+              .format(images_number, size, images_per_second, eta),
+              end='', flush=True)
+
+    def print_metrics_and_curves(self, metrics, curves):
         print('IOU: {}, Precision: {}, Recall: {}, F1 Score: {}'
               .format(metrics['iou'], metrics['precision'],
                       metrics['recall'], metrics['f1_score']))
 
+        print(self.get_curves_table(curves))
+
 
 if __name__ == '__main__':
     with open('./config.json') as config_file:
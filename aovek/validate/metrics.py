@@ -12,6 +12,9 @@ class Metrics:
         self.number_of_annotations =\
             config['label_info']['number_of_annotations']
 
+        self.metrics_batch_size =\
+            config['network']['predict']['metrics_batch_size']
+
     def eval_metrics(self, images, labels):
         labels, preds = self.process_pred_labels(images, labels)
 
@@ -23,6 +26,40 @@ class Metrics:
         return {'iou': iou, 'precision': precision, 'recall': recall,
                 'f1_score': f1_score}
 
+    def eval_raw_metrics(self, raw_preds, labels):
+        labels = np.reshape(labels, (-1, self.grid_size ** 2,
+                                     (self.number_of_annotations + 1)))
+        labels = self.get_corners_from_labels(labels)
+
+        preds = self.suppress_raw_predictions(raw_preds, self.network.nms)
+
+        iou, gt_num, tp, fp, fn = self.get_metrics_params(labels, preds)
+
+        iou, precision, recall, f1_score =\
+            self.calculate_metrics(iou, gt_num, tp, fp, fn)
+
+        return {'iou': iou, 'precision': precision, 'recall': recall,
+                'f1_score': f1_score}
+
+    def suppress_raw_predictions(self, raw_preds, nms):
+        preds = np.empty(shape=(raw_preds.shape[0], nms.max_boxes,
+                                (self.number_of_annotations + 1)),
+                         dtype=np.float32)
+        counts = np.empty(shape=(raw_preds.shape[0],), dtype=np.int32)
+
+        for start in range(0, raw_preds.shape[0], self.metrics_batch_size):
+            end = start + self.metrics_batch_size
+
+            corners_preds = self.network.boxes_to_corners(raw_preds[start:end])
+
+            preds[start:end], counts[start:end] =\
+                nms.suppress_batch(corners_preds)
+
+        preds = self.network.trim_predictions(preds, counts)
+        preds[:, :, :4] = preds[:, :, :4] * self.image_size
+
+        return preds
+
     def process_pred_labels(self, images, labels):
         labels = np.reshape(labels, (-1, self.grid_size ** 2,
                                      (self.number_of_annotations + 1)))
@@ -41,68 +78,54 @@ class Metrics:
         fp = 0
         fn = 0
 
-        for label, pred in zip(labels, preds):
-            pred = pred[~np.all(pred == 0, axis=1)]
+        for start in range(0, labels.shape[0], self.metrics_batch_size):
+            end = start + self.metrics_batch_size
 
-            iou_image, gt_num_image, tp_image, fp_image, fn_image =\
-                self.get_one_image_metrics_params(label, pred)
+            iou_batch, gt_num_batch, tp_batch, fp_batch, fn_batch =\
+                self.get_batch_metrics_params(labels[start:end],
+                                              preds[start:end])
 
-            iou += iou_image
-            gt_num += gt_num_image
+            iou += iou_batch
+            gt_num += gt_num_batch
 
-            tp += tp_image
-            fp += fp_image
-            fn += fn_image
+            tp += tp_batch
+            fp += fp_batch
+            fn += fn_batch
 
         return iou, gt_num, tp, fp, fn
 
-    def get_one_image_metrics_params(self, label, pred):
-        gt = label[np.where(label[:, 4] == 1)]
+    def get_batch_metrics_params(self, labels, preds):
+        gt_mask = labels[:, :, 4] == 1
+        pred_mask = ~np.all(preds == 0, axis=2)
 
-        iou_image = self.get_iou_for_image(gt, pred)
+        best_iou = self.get_best_iou(labels, preds, pred_mask)
 
-        iou, gt_num, tp, fp, fn =\
-            self.get_metrics_params_from_iou(iou_image, gt, pred)
+        true_boxes = gt_mask & (best_iou >= self.iou_threshold)
 
-        return iou, gt_num, tp, fp, fn
-
-    def get_iou_for_image(self, gt, pred):
-        iou_image = np.ndarray(shape=(0, pred.shape[0]),
-                               dtype=np.float32)
-
-        for box in gt:
-            gt_box = np.full(pred.shape, box)
-
-            iou_box = self.boxes_iou(gt_box, pred)
+        iou = np.sum(best_iou[true_boxes])
+        gt_num = np.count_nonzero(gt_mask)
 
-            iou_box = np.expand_dims(iou_box, axis=0)
-            iou_image = np.concatenate((iou_image, iou_box))
+        tp = np.count_nonzero(true_boxes)
+        fp = np.count_nonzero(pred_mask) - tp
+        fn = gt_num - tp
 
-        return iou_image
+        return iou, gt_num, tp, fp, fn
 
-    def get_metrics_params_from_iou(self, iou_image, gt, pred):
-        if iou_image.shape[1] != 0:
-            iou_image = np.amax(iou_image, axis=1)
-            iou_image = iou_image.flatten()
+    def get_best_iou(self, labels, preds, pred_mask):
+        if preds.shape[1] == 0:
+            return np.full(labels.shape[:2], -1, dtype=np.float32)
 
-            gt_num = gt.shape[0]
+        iou_matrix = self.get_iou_matrix(labels, preds)
 
-            true_boxes =\
-                iou_image[np.where(iou_image >= self.iou_threshold)]
+        iou_matrix = np.where(pred_mask[:, np.newaxis, :], iou_matrix, -1)
 
-            tp = true_boxes.shape[0]
-            fp = pred.shape[0] - true_boxes.shape[0]
-            fn = gt.shape[0] - true_boxes.shape[0]
-            iou = np.sum(true_boxes)
-        else:
-            iou = 0
-            gt_num = gt.shape[0]
+        return np.max(iou_matrix, axis=2)
 
-            tp = 0
-            fp = pred.shape[0]
-            fn = gt.shape[0]
+    def get_iou_matrix(self, labels, preds):
+        iou_matrix = self.boxes_iou(labels[:, :, np.newaxis, :4],
+                                    preds[:, np.newaxis, :, :4])
 
-        return iou, gt_num, tp, fp, fn
+        return iou_matrix
 
     def calculate_metrics(self, iou, gt_num, tp, fp, fn):
         iou = self.save_div(iou, tp)
@@ -114,7 +137,8 @@ class Metrics:
 
         return iou, precision, recall, f1_score
 
-    def save_div(self, num1, num2):
+    @staticmethod
+    def save_div(num1, num2):
         try:
             return num1 / num2
         except ZeroDivisionError:
@@ -137,14 +161,14 @@ class Metrics:
         return corners
 
     def boxes_iou(self, box1, box2):
-        ymin_1 = np.minimum(box1[:, 0], box1[:, 2])
-        xmin_1 = np.minimum(box1[:, 1], box1[:, 3])
-        ymax_1 = np.maximum(box1[:, 0], box1[:, 2])
-        xmax_1 = np.maximum(box1[:, 1], box1[:, 3])
-        ymin_2 = np.minimum(box2[:, 0], box2[:, 2])
-        xmin_2 = np.minimum(box2[:, 1], box2[:, 3])
-        ymax_2 = np.maximum(box2[:, 0], box2[:, 2])
-        xmax_2 = np.maximum(box2[:, 1], box2[:, 3])
+        ymin_1 = np.minimum(box1[..., 0], box1[..., 2])
+        xmin_1 = np.minimum(box1[..., 1], box1[..., 3])
+        ymax_1 = np.maximum(box1[..., 0], box1[..., 2])
+        xmax_1 = np.maximum(box1[..., 1], box1[..., 3])
+        ymin_2 = np.minimum(box2[..., 0], box2[..., 2])
+        xmin_2 = np.minimum(box2[..., 1], box2[..., 3])
+        ymax_2 = np.maximum(box2[..., 0], box2[..., 2])
+        xmax_2 = np.maximum(box2[..., 1], box2[..., 3])
 
         area_1 = (ymax_1 - ymin_1) * (xmax_1 - xmin_1)
         area_2 = (ymax_2 - ymin_2) * (xmax_2 - xmin_2)
@@ -157,8 +181,11 @@ class Metrics:
         area_inter = (np.maximum(ymax_inter - ymin_inter, 0.0) *
                       np.maximum(xmax_inter - xmin_inter, 0.0))
 
-        iou = area_inter / (area_1 + area_2 - area_inter)
+        area_union = area_1 + area_2 - area_inter
+
+        iou = np.zeros(area_inter.shape, dtype=np.float32)
+        np.divide(area_inter, area_union, out=iou, where=area_union > 0)
 
-        iou[np.where(area_1 < 0) or np.where(area_2 < 0)] = 0
+        iou = np.where((area_1 < 0) | (area_2 < 0), 0, iou)
 
         return iou
@@ -7,7 +7,7 @@ class ModelMetrics(Callback, Metrics):
 
     def __init__(self, validation_data, validation_labels, network):
         super().__init__()
-        self.validation_data = validation_data
+        self.validation_images = validation_data
         self.validation_labels = validation_labels
 
         self.iou_threshold = 0.5
@@ -17,13 +17,15 @@ class ModelMetrics(Callback, Metrics):
         self.grid_size = 9
         self.number_of_annotations = 4
 
+        self.metrics_batch_size = 1024
+
         self.network = network
 
         self.validation_metrics = {}
 
     def on_epoch_end(self, epoch, logs={}):
         validation_metrics =\
-            self.eval_metrics(self.validation_data[0], self.validation_labels)
+            self.eval_metrics(self.validation_images, self.validation_labels)
 
         self.validation_metrics[epoch] = validation_metrics
 
@@ -36,8 +38,10 @@ class ModelMetrics(Callback, Metrics):
 
         return validation_metrics
 
-    def eval_model_metrics(self, images, labels):
-        return self.eval_metrics(images, labels)
+    def eval_model_metrics(self, images, labels, store_folders=None):
+        raw_preds = self.network.predict_raw(images, store_folders)
+
+        return self.eval_raw_metrics(raw_preds, labels)
 
     def get_validation_metrics(self):
         iou = []
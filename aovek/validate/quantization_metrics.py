@@ -0,0 +1,82 @@
+import json
+from datetime import datetime
+from prettytable import PrettyTable
+
+from aovek.validate.metrics import Metrics
+from aovek.network.network import YOLO
+from aovek.utils.data_loading import DataLoading
+
+
+class QuantizationMetrics(Metrics, DataLoading):
+    """
+        Class for comparing float and quantized model accuracy and speed
+    """
+
+    def __init__(self, config):
+        Metrics.__init__(self, config)
+        DataLoading.__init__(self, config)
+
+        self.float_network = YOLO(config)
+        self.float_network.use_quantized_model = False
+        self.float_network.load_model()
+
+        self.quantized_network = YOLO(config)
+        self.quantized_network.use_quantized_model = True
+        self.quantized_network.load_model()
+
+        self.network = None
+
+        self.report_file = config['network']['quantization']['report_file']
+
+    def report(self):
+        data, labels = self.get_split('validation')
+
+        report = PrettyTable()
+
+        report.field_names = ['Model', 'IoU', 'Precision', 'Recall',
+                              'F1 Score', 'Frames/sec']
+
+        for model_type, network in (('Float', self.float_network),
+                                    ('Quantized', self.quantized_network)):
+            self.network = network
+
+            metrics, frames_per_second =\
+                self.eval_network_metrics(data, labels)
+
+            report.add_row([model_type, metrics['iou'],
+                            metrics['precision'], metrics['recall'],
+                            metrics['f1_score'], frames_per_second])
+
+        report = str(report)
+
+        print(report)
+
+        with open(self.report_file, 'a') as f:
+            f.write(report + '\n')
+
+    def eval_network_metrics(self, images, labels):
+        start_time = datetime.now()
+
+        labels, preds = self.process_pred_labels(images, labels)
+
+        end_time = datetime.now()
+
+        iou, gt_num, tp, fp, fn = self.get_metrics_params(labels, preds)
+
+        iou, precision, recall, f1_score =\
+            self.calculate_metrics(iou, gt_num, tp, fp, fn)
+
+        frames_per_second =\
+            self.save_div(images.shape[0],
+                          (end_time - start_time).total_seconds())
+
+        return ({'iou': iou, 'precision': precision, 'recall': recall,
+                 'f1_score': f1_score}, frames_per_second)
+
+
+if __name__ == '__main__':
+    with open('./config.json') as config_file:
+        config = json.load(config_file)
+
+    quantization_metrics = QuantizationMetrics(config)
+    quantization_metrics.report()
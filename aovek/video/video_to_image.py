@@ -1,4 +1,5 @@
 from datetime import datetime
+from itertools import tee
 import numpy as np
 
 from aovek.utils.video_processing import VideoProcessing
@@ -20,29 +21,52 @@ class VideoToImage(VideoProcessing):
         self.right_offset = config['video_info']['right_offset']
 
     def process_video_file(self, video_path):
-        video = self.process_video(video_path)
-        resized_video = self.resize_video(video_path)
+        video_writer = self.create_video_writer(video_path.split('/')[-1])
 
-        predictions = self.predict.predict_video(resized_video)
+        image = None
+        borders = None
 
-        original_size = list(video.shape)[1:-1]
+        chunks, prediction_chunks = tee(self.read_video_chunks(video_path))
 
-        predictions = self.predictions_to_original_size(predictions,
-                                                        original_size)
+        resized_chunks = (resized_video
+                          for video, resized_video in prediction_chunks)
+        predictions_chunks = self.predict.predict_video_chunks(resized_chunks)
 
-        self.make_video_with_rectangles(video, predictions, video_path)
+        for (video, resized_video), predictions in zip(chunks,
+                                                       predictions_chunks):
+            original_size = list(video.shape)[1:-1]
 
-        image = self.make_image(video, predictions)
+            predictions = self.predictions_to_original_size(predictions,
+                                                            original_size)
 
-        return image
+            self.write_video_with_rectangles(video_writer, video,
+                                             predictions)
 
-    def make_image(self, video, predictions):
+            if image is None:
+                image, borders = self.create_image(video)
+
+            borders = self.update_image(image, borders, video, predictions)
+
+        video_writer.close()
+
+        if image is None:
+            raise ValueError('Video has no frames: {}'.format(video_path))
+
+        return image.astype('uint8')
+
+    def create_image(self, video):
         image = np.zeros(video.shape[1:])
 
-        up_border = 0
-        down_border = image.shape[0]
-        left_border = 0
-        right_border = image.shape[1]
+        borders = {'up': 0, 'down': image.shape[0],
+                   'left': 0, 'right': image.shape[1]}
+
+        return image, borders
+
+    def update_image(self, image, borders, video, predictions):
+        up_border = borders['up']
+        down_border = borders['down']
+        left_border = borders['left']
+        right_border = borders['right']
 
         for frame, prediction in zip(video, predictions):
             if np.sum(prediction[0:4]) == 0:
@@ -71,7 +95,8 @@ class VideoToImage(VideoProcessing):
                 if int(pred[2]) < right_border:
                     right_border = int(pred[2])
 
-        return image.astype('uint8')
+        return {'up': up_border, 'down': down_border,
+                'left': left_border, 'right': right_border}
 
     def predictions_to_original_size(self, predictions, original_size):
         predictions[:, :, 0] *= original_size[1] * self.left_offset
@@ -81,11 +106,12 @@ class VideoToImage(VideoProcessing):
 
         return predictions
 
-    def make_video_with_rectangles(self, video, predictions, video_path):
+    def write_video_with_rectangles(self, video_writer, video, predictions):
         video_with_rectangles =\
             self.draw_rectangles_in_video(video, predictions)
 
-        self.write_video(video_with_rectangles, video_path.split('/')[-1])
+        for frame in video_with_rectangles:
+            video_writer.writeFrame(frame)
 
     def draw_rectangles_in_video(self, video, predictions):
         rect_color = 0
@@ -34,7 +34,6 @@ class Predict(ImageProcessing):
         original_image = self.load_image(image_file)
 
         predict = self.network.predict_boxes(image)
-        predict = self.network.sess_run(predict)
 
         self.draw_rectangles(original_image, original_size, predict)
 
@@ -51,10 +50,9 @@ class Predict(ImageProcessing):
 
         return predict
 
-    def predict_video(self, video):
-        predictions = self.network.predict_images(video)
-
-        return predictions
+    def predict_video_chunks(self, video_chunks):
+        for predictions in self.network.predict_image_chunks(video_chunks):
+            yield predictions
 
     def make_predictions_for_datasets(self):
         start_time = datetime.now()